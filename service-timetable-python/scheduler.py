@@ -22,19 +22,31 @@ Version: 5.1 (Enhanced VTU Compliance)
    - Helps distribute labs across weekdays
 """
 
+import heapq
 import random
+import sys
 from typing import List, Dict, Set, Tuple
-from dataclasses import dataclass
-from collections import defaultdict
-import copy
+from dataclasses import asdict, dataclass, field
+from collections import Counter, defaultdict, deque
+from functools import lru_cache
+from operator import attrgetter
+from contextlib import contextmanager
 import time
+from multiprocessing import Pool, cpu_count, get_context
 
+import numpy as np
+
+from scheduler_kernels import (
+    COL_DAY, COL_FACULTY, COL_PERIOD, COL_ROOM, COL_SECTION, NUMBA_AVAILABLE,
+    build_bookings, fitness_bound, metrics_kernel, population_metrics_kernel,
+    seed_kernel_rng, set_kernel_threads, slot_move_delta, tabu_search,
+)
 
 # ===========================
 # DATA CLASSES (Same as yours)
 # ===========================
 
-@dataclass
+@dataclass(slots=True)
 class Subject:
     subject_code: str
     subject_name: str
@@ -46,15 +58,20 @@ class Subject:
     no_of_batches: int
     section: str
     semester: str
+    # "<semester>_<section>", the id its genes carry; built and interned once
+    section_id: str = field(init=False)
+    
+    def __post_init__(self):
+        self.section_id = sys.intern(f"{self.semester}_{self.section}")
 
 
-@dataclass
+@dataclass(slots=True)
 class Faculty:
     id: str
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Section:
     id: str
     name: str
@@ -62,14 +79,16 @@ class Section:
     classroom: str
 
 
-@dataclass
+@dataclass(slots=True)
 class LabRoom:
     id: str
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TimeSlot:
+    # Shared between chromosome clones, so never changed in place: a move
+    # replaces the gene in its chromosome's list with gene.moved(...)
     day: int
     period: int
     subject_code: str
@@ -80,6 +99,12 @@ class TimeSlot:
     room_id: str
     batch_number: int = 0
     is_theory: bool = True
+    
+    def moved(self, day: int, period: int) -> 'TimeSlot':
+        """Copy of this gene at (day, period)"""
+        return TimeSlot(day, period, self.subject_code, self.subject_name,
+                        self.subject_type, self.faculty_id, self.section_id, self.room_id,
+                        self.batch_number, self.is_theory)
 
 
 # ===========================
@@ -144,76 +169,265 @@ class VTUSubjectValidator:
 # ===========================
 
 class CSPConstraintChecker:
-    """Fast constraint checking using set-based lookups"""
+    """
+    Fast constraint checking on occupancy bitmasks: one int per faculty,
+    section and room, with bit (day * periods_per_day + period) set when
+    that resource is busy in the slot
+    """
+    
+    def __init__(self, periods_per_day: int = 7):
+        self.periods_per_day = periods_per_day
+        self.faculty_masks: Dict[str, int] = defaultdict(int)
+        self.section_masks: Dict[str, int] = defaultdict(int)
+        self.room_masks: Dict[str, int] = defaultdict(int)
     
-    def __init__(self):
-        self.faculty_slots: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
-        self.section_slots: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
-        self.room_slots: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
+    def _bit(self, day: int, period: int) -> int:
+        return 1 << (day * self.periods_per_day + period)
+    
+    def block_mask(self, day: int, start_period: int, length: int) -> int:
+        """Bits of `length` consecutive periods from start_period on day"""
+        return ((1 << length) - 1) << (day * self.periods_per_day + start_period)
     
     def add_slot(self, gene: TimeSlot):
         """Add a time slot to constraint checker"""
-        key = (gene.day, gene.period)
-        self.faculty_slots[key].add(gene.faculty_id)
-        self.section_slots[key].add(gene.section_id)
+        bit = self._bit(gene.day, gene.period)
+        self.faculty_masks[gene.faculty_id] |= bit
+        self.section_masks[gene.section_id] |= bit
         if gene.is_theory or not gene.batch_number:
-            self.room_slots[key].add(gene.room_id)
+            self.room_masks[gene.room_id] |= bit
     
     def remove_slot(self, gene: TimeSlot):
         """Remove a time slot from constraint checker"""
-        key = (gene.day, gene.period)
-        self.faculty_slots[key].discard(gene.faculty_id)
-        self.section_slots[key].discard(gene.section_id)
+        bit = ~self._bit(gene.day, gene.period)
+        self.faculty_masks[gene.faculty_id] &= bit
+        self.section_masks[gene.section_id] &= bit
         if gene.is_theory or not gene.batch_number:
-            self.room_slots[key].discard(gene.room_id)
+            self.room_masks[gene.room_id] &= bit
     
     def check_conflicts(self, gene: TimeSlot) -> int:
         """Return number of conflicts for this slot"""
         conflicts = 0
-        key = (gene.day, gene.period)
+        bit = self._bit(gene.day, gene.period)
         
-        if gene.faculty_id in self.faculty_slots[key]:
+        if self.faculty_masks.get(gene.faculty_id, 0) & bit:
             conflicts += 1
-        if gene.section_id in self.section_slots[key]:
+        if self.section_masks.get(gene.section_id, 0) & bit:
             conflicts += 1
-        if gene.is_theory and gene.room_id in self.room_slots[key]:
+        if gene.is_theory and self.room_masks.get(gene.room_id, 0) & bit:
             conflicts += 1
         
         return conflicts
     
+    def busy_mask(self, faculty_id: str, section_id: str, room_id: str, is_theory: bool) -> int:
+        """Slot bits where is_available would fail for these resources"""
+        busy = 0
+        if faculty_id:
+            busy |= self.faculty_masks.get(faculty_id, 0)
+        if section_id:
+            busy |= self.section_masks.get(section_id, 0)
+        if is_theory and room_id:
+            busy |= self.room_masks.get(room_id, 0)
+        return busy
+    
     def is_available(self, day: int, period: int, faculty_id: str, 
                      section_id: str, room_id: str, is_theory: bool) -> bool:
         """Check if slot is completely available"""
-        key = (day, period)
+        bit = self._bit(day, period)
         
-        if faculty_id and faculty_id in self.faculty_slots[key]:
+        if faculty_id and self.faculty_masks.get(faculty_id, 0) & bit:
             return False
-        if section_id and section_id in self.section_slots[key]:
+        if section_id and self.section_masks.get(section_id, 0) & bit:
             return False
-        if is_theory and room_id and room_id in self.room_slots[key]:
+        if is_theory and room_id and self.room_masks.get(room_id, 0) & bit:
             return False
         
         return True
     
+    def copy(self) -> 'CSPConstraintChecker':
+        """Independent copy (masks are immutable ints, so a dict copy suffices)"""
+        clone = CSPConstraintChecker(self.periods_per_day)
+        clone.faculty_masks.update(self.faculty_masks)
+        clone.section_masks.update(self.section_masks)
+        clone.room_masks.update(self.room_masks)
+        return clone
+    
     def rebuild_from_genes(self, genes: List[TimeSlot]):
         """Rebuild constraint checker from scratch"""
-        self.__init__()
+        self.__init__(self.periods_per_day)
+        self.add_genes(genes)
+    
+    def add_genes(self, genes: List[TimeSlot]):
+        """add_slot for every gene"""
+        # add_slot inlined, with the masks and row width bound locally
+        faculty_masks, section_masks, room_masks = (
+            self.faculty_masks, self.section_masks, self.room_masks
+        )
+        periods_per_day = self.periods_per_day
         for gene in genes:
-            self.add_slot(gene)
+            bit = 1 << (gene.day * periods_per_day + gene.period)
+            faculty_masks[gene.faculty_id] |= bit
+            section_masks[gene.section_id] |= bit
+            if gene.is_theory or not gene.batch_number:
+                room_masks[gene.room_id] |= bit
+
+
+class MasterScheduleOccupancy:
+    """
+    Occupancy of the fixed master schedule, built once per GA run and
+    shared by reference across every chromosome
+    """
+    
+    def __init__(self, master_schedule: List[Dict], periods_per_day: int = 7):
+        self.checker = CSPConstraintChecker(periods_per_day)
+        self.bookings = Counter()
+        # Lab room -> week bitmask of the slots its master schedule labs hold
+        self.lab_room_masks: Dict[str, int] = defaultdict(int)
+        
+        for slot in master_schedule:
+            day, period = slot['day'], slot['period']
+            is_theory = slot.get('is_theory', True)
+            fake_gene = TimeSlot(
+                day=day, period=period,
+                subject_code='', subject_name='', subject_type='',
+                faculty_id=slot['faculty_id'], section_id=slot['section_id'],
+                room_id=slot['room_id'], is_theory=is_theory
+            )
+            self.checker.add_slot(fake_gene)
+            
+            self.bookings[(day, period, 'faculty', slot['faculty_id'])] += 1
+            self.bookings[(day, period, 'section', slot['section_id'])] += 1
+            self.bookings[(day, period, 'room', slot['room_id'])] += 1
+            
+            if not is_theory:
+                self.lab_room_masks[slot['room_id']] |= self.checker._bit(day, period)
+    
+    def new_lab_room_masks(self) -> Dict[str, int]:
+        """Fresh lab room bitmasks pre-filled with the master schedule labs"""
+        return self.lab_room_masks.copy()
 
 
 # ===========================
-# OPTIMIZED TIMETABLE CHROMOSOME
+# ARRAY HELPERS
 # ===========================
 
-class OptimizedTimetableChromosome:
-    """Highly optimized chromosome with CSP integration"""
+METRIC_KEYS = (
+    'faculty_conflicts', 'section_conflicts', 'room_conflicts', 'lab_continuity',
+    'project_continuity', 'gaps', 'theory_distribution', 'theory_afternoon',
+    'sparse_days', 'saturday_labs',
+)
+
+METRIC_WEIGHTS = {
+    # Hard constraints
+    'faculty_conflicts': 500,
+    'section_conflicts': 500,
+    'room_conflicts': 400,
+    # Lab continuity
+    'lab_continuity': 200,
+    # Project constraints
+    'project_continuity': 300,
+    # Soft constraints
+    'gaps': 100,
+    'theory_distribution': 50,
+    'theory_afternoon': 100,
+    'sparse_days': 30,
+    'saturday_labs': 50,  # ✅ VTU Saturday holiday penalty
+}
+
+# METRIC_WEIGHTS in METRIC_KEYS order, for the compiled kernels
+WEIGHT_VECTOR = np.array([METRIC_WEIGHTS[key] for key in METRIC_KEYS], dtype=np.int64)
+
+
+def _intern(keys: List[str]) -> Dict[str, int]:
+    """Map each distinct key to a contiguous int id, in first-seen order"""
+    table = {}
+    for key in keys:
+        table.setdefault(key, len(table))
+    return table
+
+
+def _slot_mask_array(masks: Dict[str, int], to_idx: Dict[str, int]) -> np.ndarray:
+    """Constraint checker slot bitmasks indexed by interned id (0 where none), as int64"""
+    array = np.zeros(len(to_idx), dtype=np.int64)
+    for key, idx in to_idx.items():
+        array[idx] = masks.get(key, 0)
+    return array
+
+
+@lru_cache(maxsize=None)
+def _is_project_type(subject_type: str) -> bool:
+    """Cached VTUSubjectValidator.is_project for per-gene lookups"""
+    return VTUSubjectValidator.is_project(subject_type)
+
+
+def _dense_counts(shape: Tuple[int, ...], *columns: np.ndarray) -> np.ndarray:
+    """Occurrences of every index tuple (one int column per axis) as a dense array"""
+    flat = np.ravel_multi_index(columns, shape)
+    return np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+
+def _overbooked(counts: np.ndarray) -> int:
+    """Sum of (count - 1) over every cell booked more than once"""
+    return int(np.maximum(counts - 1, 0).sum())
+
+
+def _period_span(occupied: np.ndarray) -> np.ndarray:
+    """last - first + 1 over the period (last) axis of a bool occupancy array"""
+    num_periods = occupied.shape[-1]
+    first = occupied.argmax(axis=-1)
+    last = num_periods - 1 - occupied[..., ::-1].argmax(axis=-1)
+    return last - first + 1
+
+
+def _slot_score(period: int, periods_mask: int) -> int:
+    """
+    Subject-independent part of the CSP slot score of `period` on a day
+    whose booked periods are the set bits of periods_mask
+    """
+    score = 100
+    
+    # Prefer continuous slots
+    if periods_mask:
+        first = (periods_mask & -periods_mask).bit_length() - 1
+        last = periods_mask.bit_length() - 1
+        if period == last + 1 or period == first - 1:
+            score += 80  # Bonus for continuity
+        else:
+            # Distance to the nearest booked period on either side
+            below = periods_mask & ((2 << period) - 1)
+            above = periods_mask >> period
+            min_gap = min(
+                period - (below.bit_length() - 1) if below else period + 64,
+                (above & -above).bit_length() - 1 if above else 64,
+            )
+            score -= min_gap * 15
+    
+    # Prefer starting from period 0
+    if period == 0:
+        score += 50
+    
+    return score
+
+
+def _slot_score_table(periods_per_day: int) -> Tuple[Tuple[int, ...], ...]:
+    """_slot_score of every (periods_mask, period) pair: table[periods_mask][period]"""
+    return tuple(tuple(_slot_score(period, mask) for period in range(periods_per_day))
+                 for mask in range(1 << periods_per_day))
+
+
+# ===========================
+# SHARED SCHEDULE CONTEXT
+# ===========================
+
+class ScheduleContext:
+    """
+    Read-only inputs and lookup tables of one GA run. Built once and
+    shared by reference across every chromosome of the population.
+    """
     
     def __init__(self, subjects: List[Subject], faculties: List[Faculty],
                  sections: List[Section], lab_rooms: List[LabRoom],
                  master_schedule: List[Dict], days_per_week: int = 6,
                  periods_per_day: int = 7):
-        
         self.subjects = subjects
         self.faculties = {f.id: f for f in faculties}
         self.sections = {s.id: s for s in sections}
@@ -221,81 +435,314 @@ class OptimizedTimetableChromosome:
         self.master_schedule = master_schedule
         self.days_per_week = days_per_week
         self.periods_per_day = periods_per_day
-        self.morning_periods = [0, 1, 2, 3]
-        self.afternoon_periods = [4, 5, 6]
+        self.morning_periods = (0, 1, 2, 3)
+        self.afternoon_periods = (4, 5, 6)
+        self.afternoon_mask = np.zeros(periods_per_day, dtype=np.bool_)
+        self.afternoon_mask[list(self.afternoon_periods)] = True
+        # Week-wide slot bitmasks in the constraint checker's bit layout
+        self.morning_slot_mask = self._week_slot_mask(self.morning_periods)
+        self.afternoon_slot_mask = self._week_slot_mask(self.afternoon_periods)
+        # Every slot a gene may take, and the start slots of 2-hour lab blocks
+        self.week_slot_mask = self.morning_slot_mask | self.afternoon_slot_mask
+        self.lab_start_slot_mask = self._week_slot_mask((0, 2, 4))
+        # CSP slot scores of every (day's booked periods mask, period)
+        self.slot_score_table = _slot_score_table(periods_per_day)
+        
+        # Per-subject scalars, indexed by subject position, so the CSP
+        # helpers never rebuild section ids or look up classrooms
+        self.subject_section_ids = tuple(s.section_id for s in subjects)
+        # Distinct section ids genes can carry (crossover columns are per day of these)
+        self.gene_section_ids = tuple(dict.fromkeys(self.subject_section_ids))
+        self.subject_classrooms = tuple(
+            self.sections[section_id].classroom if section_id in self.sections else None
+            for section_id in self.subject_section_ids
+        )
+        self.project_subject_idx = tuple(
+            i for i, s in enumerate(subjects) if VTUSubjectValidator.is_project(s.subject_type)
+        )
+        # One entry per theory hour to place
+        self.theory_hour_subject_idx = tuple(
+            i for i, s in enumerate(subjects) for _ in range(s.theory_hours)
+        )
         
-        self.genes: List[TimeSlot] = []
-        self.fitness = 0.0
-        self.constraint_checker = CSPConstraintChecker()
-        self.lab_usage_tracker = defaultdict(set)
+        # Intern string ids to contiguous ints for the array-based fitness.
+        # Every id a gene can carry comes from these inputs.
+        self.faculty_to_idx = _intern(
+            list(self.faculties)
+            + [f for s in subjects for f in (s.theory_faculty, s.lab_faculty)]
+        )
+        self.section_to_idx = _intern(
+            list(self.sections) + list(self.subject_section_ids)
+        )
+        self.room_to_idx = _intern([s.classroom for s in sections] + list(self.lab_rooms))
+        self.subject_to_idx = _intern([s.subject_code for s in subjects])
+        
+        # Master schedule constraints
+        self.master_occupancy = MasterScheduleOccupancy(master_schedule, periods_per_day)
+        # The same bookings per interned faculty, section and room, for the
+        # kernels that move packed genes
+        master_checker = self.master_occupancy.checker
+        self.master_faculty_slots = _slot_mask_array(master_checker.faculty_masks,
+                                                     self.faculty_to_idx)
+        self.master_section_slots = _slot_mask_array(master_checker.section_masks,
+                                                     self.section_to_idx)
+        self.master_room_slots = _slot_mask_array(master_checker.room_masks, self.room_to_idx)
         
         # Validate subjects
         for subject in self.subjects:
             VTUSubjectValidator.validate_subject(subject)
+    
+    def _week_slot_mask(self, periods) -> int:
+        """Checker slot bits of the given periods on every day of the week"""
+        day_bits = sum(1 << p for p in periods)
+        return sum(day_bits << (day * self.periods_per_day) for day in range(self.days_per_week))
+
+
+# ===========================
+# OPTIMIZED TIMETABLE CHROMOSOME
+# ===========================
+
+class OptimizedTimetableChromosome:
+    """Highly optimized chromosome with CSP integration"""
+    
+    # Attributes aliased from the shared ScheduleContext (never mutated)
+    SHARED_ATTRS = (
+        'subjects', 'faculties', 'sections', 'lab_rooms', 'master_schedule',
+        'days_per_week', 'periods_per_day', 'morning_periods', 'afternoon_periods',
+        'afternoon_mask', 'morning_slot_mask', 'afternoon_slot_mask', 'week_slot_mask',
+        'lab_start_slot_mask', 'slot_score_table',
+        'subject_section_ids', 'gene_section_ids', 'subject_classrooms', 'project_subject_idx',
+        'theory_hour_subject_idx',
+        'faculty_to_idx', 'section_to_idx', 'room_to_idx', 'subject_to_idx',
+        'master_occupancy', 'master_faculty_slots', 'master_section_slots', 'master_room_slots',
+    )
+    
+    def __init__(self, subjects: List[Subject], faculties: List[Faculty],
+                 sections: List[Section], lab_rooms: List[LabRoom],
+                 master_schedule: List[Dict], days_per_week: int = 6,
+                 periods_per_day: int = 7,
+                 context: ScheduleContext = None):
         
-        # Initialize master schedule constraints
-        for slot in self.master_schedule:
-            fake_gene = TimeSlot(
-                day=slot['day'], period=slot['period'],
-                subject_code='', subject_name='', subject_type='',
-                faculty_id=slot['faculty_id'], section_id=slot['section_id'],
-                room_id=slot['room_id'], is_theory=slot.get('is_theory', True)
-            )
-            self.constraint_checker.add_slot(fake_gene)
-            
-            if not slot.get('is_theory', True):
-                self.lab_usage_tracker[(slot['day'], slot['period'])].add(slot['room_id'])
+        if context is None:
+            context = ScheduleContext(subjects, faculties, sections, lab_rooms,
+                                      master_schedule, days_per_week, periods_per_day)
+        self.attach_context(context)
+        
+        self.genes: List[TimeSlot] = []
+        self.fitness = 0.0
+        self.raw_fitness = 0.0
+        self.constraint_checker = self.master_occupancy.checker.copy()
+        self.lab_room_masks = self.master_occupancy.new_lab_room_masks()
+        # Cached _build_arrays() view of the genes; None once they change
+        self._arrays = None
+    
+    def genes_changed(self):
+        """Invalidate the cached gene arrays. Call after any edit to the genes."""
+        self._arrays = None
+    
+    @classmethod
+    def from_context(cls, context: ScheduleContext) -> 'OptimizedTimetableChromosome':
+        """Empty chromosome over an already built context"""
+        return cls(context.subjects, [], [], [], context.master_schedule,
+                   context.days_per_week, context.periods_per_day, context=context)
+    
+    def attach_context(self, context: ScheduleContext):
+        """Point the shared read-only attributes at `context`"""
+        self.context = context
+        for name in self.SHARED_ATTRS:
+            setattr(self, name, getattr(context, name))
+    
+    def __getstate__(self):
+        """
+        Pickle only the per-chromosome state. The receiver must call
+        attach_context (the context would otherwise be duplicated per
+        chromosome).
+        """
+        shared = set(self.SHARED_ATTRS) | {'context'}
+        return {k: v for k, v in self.__dict__.items() if k not in shared}
+    
+    def clone(self, genes: List[TimeSlot] = None) -> 'OptimizedTimetableChromosome':
+        """
+        Copy only the per-chromosome state (gene list, constraint checker,
+        lab room masks, fitness). The shared context is referenced, not
+        copied, and so are the genes themselves and the cached gene arrays
+        (neither is ever written to).
+        genes: build the copy from these genes instead (e.g. a crossover
+        child); its constraint checker is rebuilt from them and the
+        master schedule.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone.lab_room_masks = self.lab_room_masks.copy()
+        if genes is None:
+            clone.genes = list(self.genes)
+            clone.constraint_checker = self.constraint_checker.copy()
+        else:
+            clone.genes = list(genes)
+            clone.genes_changed()
+            clone.rebuild_constraint_checker()
+        return clone
+    
+    def rebuild_constraint_checker(self):
+        """
+        Constraint checker from scratch: the master schedule occupancy
+        plus the genes (a bare rebuild_from_genes would drop the former)
+        """
+        self.constraint_checker = self.master_occupancy.checker.copy()
+        self.constraint_checker.add_genes(self.genes)
+    
+    def __deepcopy__(self, memo):
+        clone = self.clone()
+        memo[id(self)] = clone
+        return clone
+    
+    def _iter_slots(self, slot_mask: int):
+        """(day, period) of each set bit, in day-major order"""
+        periods_per_day = self.periods_per_day
+        while slot_mask:
+            low = slot_mask & -slot_mask
+            slot_mask ^= low
+            yield divmod(low.bit_length() - 1, periods_per_day)
+    
+    def _nth_slot(self, slot_mask: int, n: int) -> Tuple[int, int]:
+        """(day, period) of the n-th set bit in day-major order, without listing them"""
+        for _ in range(n):
+            slot_mask &= slot_mask - 1
+        return divmod((slot_mask & -slot_mask).bit_length() - 1, self.periods_per_day)
     
-    def initialize_with_csp(self):
-        """Initialize using CSP-guided approach for better starting population"""
+    def initialize_with_csp(self, backtracking: bool = False, rng: random.Random = None):
+        """
+        Initialize using CSP-guided approach for better starting population
+        backtracking: place the theory hours by backtracking search (see
+        _schedule_theory_backtracking) instead of one greedy pass
+        rng: shuffles the theory hours (the global random module if None)
+        """
         self.genes = []
-        self.constraint_checker.rebuild_from_genes([])
-        
-        # Re-add master schedule
-        for slot in self.master_schedule:
-            fake_gene = TimeSlot(
-                day=slot['day'], period=slot['period'],
-                subject_code='', subject_name='', subject_type='',
-                faculty_id=slot['faculty_id'], section_id=slot['section_id'],
-                room_id=slot['room_id'], is_theory=slot.get('is_theory', True)
-            )
-            self.constraint_checker.add_slot(fake_gene)
+        self.genes_changed()
         
-        # Reset lab usage
-        self.lab_usage_tracker = defaultdict(set)
-        for slot in self.master_schedule:
-            if not slot.get('is_theory', True):
-                self.lab_usage_tracker[(slot['day'], slot['period'])].add(slot['room_id'])
+        # Start from the master schedule occupancy
+        self.constraint_checker = self.master_occupancy.checker.copy()
+        self.lab_room_masks = self.master_occupancy.new_lab_room_masks()
         
         # Phase 1: Schedule projects (highest priority)
-        project_subjects = [s for s in self.subjects if VTUSubjectValidator.is_project(s.subject_type)]
-        for subject in project_subjects:
-            section_id = f"{subject.semester}_{subject.section}"
-            self._schedule_project_csp(subject, section_id)
+        for subject_idx in self.project_subject_idx:
+            self._schedule_project_csp(subject_idx)
         
         # Phase 2: Schedule parallel labs with CSP
         self._schedule_parallel_labs_csp()
         
         # Phase 3: Schedule theory with CSP heuristics
-        theory_subjects = [s for s in self.subjects if s.theory_hours > 0]
-        theory_hours = []
-        for subject in theory_subjects:
-            for _ in range(subject.theory_hours):
-                theory_hours.append(subject)
+        theory_hours = list(self.theory_hour_subject_idx)
         
         # Sort by Most Constrained Variable (MCV) heuristic
-        random.shuffle(theory_hours)
+        (rng or random).shuffle(theory_hours)
         
-        for subject in theory_hours:
-            section_id = f"{subject.semester}_{subject.section}"
-            self._schedule_theory_with_csp(subject, section_id)
+        # Per-(section, day) period bitmask and subjects, kept up to date
+        # as theory hours are placed so slot scoring never rescans genes
+        day_periods = defaultdict(int)
+        day_subjects = defaultdict(set)
+        for gene in self.genes:
+            day_periods[(gene.section_id, gene.day)] |= 1 << gene.period
+            day_subjects[(gene.section_id, gene.day)].add(gene.subject_code)
+        
+        if backtracking:
+            self._schedule_theory_backtracking(theory_hours, day_periods, day_subjects)
+            return
+        
+        for subject_idx in theory_hours:
+            self._schedule_theory_with_csp(subject_idx, day_periods, day_subjects)
     
-    def _schedule_project_csp(self, subject: Subject, section_id: str):
+    def _schedule_theory_backtracking(self, theory_hours: List[int],
+                                      day_periods: Dict[Tuple[str, int], int],
+                                      day_subjects: Dict[Tuple[str, int], Set[str]],
+                                      max_displacements: int = 3):
+        """
+        CSP backtracking for the theory hours. The next hour placed is one
+        of the subject with the fewest free slots left (MRV). A subject
+        with none takes the slot that displaces the fewest theory hours
+        already placed, and those go back to the queue. Project, lab and
+        master schedule slots are never displaced; a subject is displaced
+        at most max_displacements times, then its hour is dropped.
+        """
+        checker = self.constraint_checker
+        fixed = checker.copy()  # everything placed before the theory hours
+        genes = self.genes
+        subjects = self.subjects
+        # Genes per (section, day, subject): a displaced hour's subject
+        # leaves day_subjects once none of its genes is left that day
+        day_subject_genes = Counter((g.section_id, g.day, g.subject_code) for g in genes)
+        position = {}  # id(gene) -> index in genes, for the theory hours placed here
+        pending = Counter(i for i in theory_hours if subjects[i].theory_faculty)
+        displacements = Counter()
+        placed = defaultdict(list)  # (day, period) -> [(subject_idx, gene)]
+        
+        def free_slots(subject_idx, checker):
+            return self.week_slot_mask & ~checker.busy_mask(
+                subjects[subject_idx].theory_faculty, self.subject_section_ids[subject_idx],
+                self.subject_classrooms[subject_idx], True
+            )
+        
+        while pending:
+            subject_idx = min(pending, key=lambda i: free_slots(i, checker).bit_count())
+            pending[subject_idx] -= 1
+            if not pending[subject_idx]:
+                del pending[subject_idx]
+            
+            if not free_slots(subject_idx, checker):
+                # Dead end: free the slot with the fewest displaceable blockers
+                subject = subjects[subject_idx]
+                section_id = self.subject_section_ids[subject_idx]
+                classroom = self.subject_classrooms[subject_idx]
+                best_slot, best_blockers = None, None
+                candidates = free_slots(subject_idx, fixed)
+                for mask in (self.morning_slot_mask, self.afternoon_slot_mask):
+                    for slot in self._iter_slots(mask & candidates):
+                        blockers = [
+                            (i, gene) for i, gene in placed[slot]
+                            if gene.faculty_id == subject.theory_faculty
+                            or gene.section_id == section_id or gene.room_id == classroom
+                        ]
+                        if (all(displacements[i] < max_displacements for i, _ in blockers)
+                                and (best_blockers is None or len(blockers) < len(best_blockers))):
+                            best_slot, best_blockers = slot, blockers
+                
+                if best_slot is None:
+                    print(f"      ❌ Could not schedule theory for {subject.subject_code}")
+                    continue
+                
+                day, period = best_slot
+                for blocker in best_blockers:
+                    i, gene = blocker
+                    placed[best_slot].remove(blocker)
+                    # Swap-remove by index: the last gene takes its place
+                    index = position.pop(id(gene))
+                    last = genes.pop()
+                    if last is not gene:
+                        genes[index] = last
+                        position[id(last)] = index
+                    checker.remove_slot(gene)
+                    key = (gene.section_id, day)
+                    day_periods[key] &= ~(1 << period)
+                    day_subject_genes[(gene.section_id, day, gene.subject_code)] -= 1
+                    if not day_subject_genes[(gene.section_id, day, gene.subject_code)]:
+                        day_subjects[key].discard(gene.subject_code)
+                    pending[i] += 1
+                    displacements[i] += 1
+            
+            # At least one slot is free now, so the hour is placed
+            gene = self._schedule_theory_with_csp(subject_idx, day_periods, day_subjects)
+            position[id(gene)] = len(genes) - 1
+            day_subject_genes[(gene.section_id, gene.day, gene.subject_code)] += 1
+            placed[(gene.day, gene.period)].append((subject_idx, gene))
+    
+    def _schedule_project_csp(self, subject_idx: int):
         """Schedule project using CSP forward checking"""
+        subject = self.subjects[subject_idx]
         if not subject.lab_faculty:
             return
         
-        classroom = self.sections[section_id].classroom
+        section_id = self.subject_section_ids[subject_idx]
+        classroom = self.subject_classrooms[subject_idx]
         blocks_needed = subject.lab_hours // 3
         scheduled = 0
         
@@ -304,15 +751,15 @@ class OptimizedTimetableChromosome:
             if scheduled >= blocks_needed:
                 break
             
-            # Check if all afternoon slots available
-            all_available = all(
-                self.constraint_checker.is_available(
-                    day, p, subject.lab_faculty, section_id, classroom, False
-                )
-                for p in self.afternoon_periods
+            # Check if all afternoon slots available (one mask test)
+            afternoon = self.afternoon_slot_mask & self.constraint_checker.block_mask(
+                day, 0, self.periods_per_day
+            )
+            busy = self.constraint_checker.busy_mask(
+                subject.lab_faculty, section_id, classroom, False
             )
             
-            if all_available:
+            if not busy & afternoon:
                 # Schedule the 3-hour block
                 for period in self.afternoon_periods:
                     gene = TimeSlot(
@@ -331,13 +778,19 @@ class OptimizedTimetableChromosome:
         SMART SCHEDULING: If section has projects, avoid afternoon ONLY on days with projects.
         Other days can use afternoon slots for labs.
         """
-        lab_subjects = [s for s in self.subjects
+        lab_subjects = [(i, s) for i, s in enumerate(self.subjects)
                     if s.lab_hours > 0 and not VTUSubjectValidator.is_project(s.subject_type)]
 
+        # Days each section has a project on, from one pass over the genes
+        project_days_by_section = defaultdict(set)
+        for gene in self.genes:
+            if VTUSubjectValidator.is_project(gene.subject_type):
+                project_days_by_section[gene.section_id].add(gene.day)
+
         labs_by_section = defaultdict(list)
-        for sub in lab_subjects:
+        for subject_idx, sub in lab_subjects:
             if sub.lab_faculty:
-                labs_by_section[f"{sub.semester}_{sub.section}"].append(sub)
+                labs_by_section[self.subject_section_ids[subject_idx]].append(sub)
 
         for section_id, labs in labs_by_section.items():
             if len(labs) < 2:
@@ -350,11 +803,7 @@ class OptimizedTimetableChromosome:
             actual_batches = max([s.no_of_batches for s in labs if s.no_of_batches > 0], default=2)
 
             # Track which days have projects for this section
-            project_days = set()
-            for gene in self.genes:
-                if (gene.section_id == section_id and
-                    VTUSubjectValidator.is_project(gene.subject_type)):
-                    project_days.add(gene.day)
+            project_days = project_days_by_section[section_id]
 
             # INTELLIGENT MODE SELECTION
             if num_subjects > available_lab_rooms:
@@ -382,91 +831,75 @@ class OptimizedTimetableChromosome:
 
             scheduled_sessions = 0
 
+            # Forward checking: every feasible block up front. Blocks never
+            # overlap, so booking one leaves the rest of the domain valid
+            # and session k simply takes the k-th block.
+            domain = self._lab_block_domain(
+                section_id, [lab.lab_faculty for lab in labs], project_days, parallel_slots
+            )
+
             for session_idx in range(sessions_needed):
                 print(f"\n       📅 Session {session_idx + 1}/{sessions_needed}:")
-                slot_found = False
-
-                for day in range(self.days_per_week):
-                    if slot_found:
-                        break
-
-                    # ✅ SMART: Choose valid start periods based on whether THIS DAY has a project
-                    if day in project_days:
-                        # This day has a project in afternoon (4-5-6), so only use morning for labs
-                        valid_start_periods = [0, 2]
-                    else:
-                        # This day is free - can use morning OR afternoon
-                        valid_start_periods = [0, 2, 4]
 
-                    for start_period in valid_start_periods:
-                        if slot_found:
-                            break
-
-                        if not self._validate_parallel_lab_slot(
-                            day, start_period, section_id, labs, parallel_slots
-                        ):
-                            continue
+                if session_idx >= len(domain):
+                    print(f"          ❌ Could not find slot for session {session_idx + 1}")
+                    continue
 
-                        available_rooms = self._get_available_lab_rooms(day, start_period, 2)
-                        if len(available_rooms) < parallel_slots:
-                            continue
-                        
-                        print(f"          ✅ Found slot: Day {day}, Periods {start_period}-{start_period+1}")
+                day, start_period, available_rooms = domain[session_idx]
+                
+                print(f"          ✅ Found slot: Day {day}, Periods {start_period}-{start_period+1}")
 
-                        # ✅ CRITICAL FIX: Schedule ALL batches for BOTH hours
-                        genes_to_add = []  # Collect all genes first
+                # ✅ CRITICAL FIX: Schedule ALL batches for BOTH hours
+                genes_to_add = []  # Collect all genes first
 
-                        for batch_idx in range(parallel_slots):
-                            rotated_subject_idx = (batch_idx + session_idx) % num_subjects
-                            subject = labs[rotated_subject_idx]
-                            room_id = available_rooms[batch_idx]
-                            batch_number = batch_idx + 1
+                for batch_idx in range(parallel_slots):
+                    rotated_subject_idx = (batch_idx + session_idx) % num_subjects
+                    subject = labs[rotated_subject_idx]
+                    room_id = available_rooms[batch_idx]
+                    batch_number = batch_idx + 1
 
-                            print(f"             Batch {batch_number} → {subject.subject_code} in {room_id}")
-                            
-                            # Create BOTH time slots (hour 0 and hour 1)
-                            for hour in range(2):
-                                gene = TimeSlot(
-                                    day=day,
-                                    period=start_period + hour,
-                                    subject_code=subject.subject_code,
-                                    subject_name=subject.subject_name,
-                                    subject_type=subject.subject_type,
-                                    faculty_id=subject.lab_faculty,
-                                    section_id=section_id,
-                                    room_id=room_id,
-                                    batch_number=batch_number,
-                                    is_theory=False
-                                )
-                                genes_to_add.append(gene)
-                                
-                                # ✅ DEBUG: Verify gene creation
-                                print(f"                 Created: Day {day}, P{start_period + hour}, "
-                                    f"Batch {batch_number}, {subject.subject_code}")
-                            
-                            # Reserve lab room for both periods
-                            self.lab_usage_tracker[(day, start_period)].add(room_id)
-                            self.lab_usage_tracker[(day, start_period + 1)].add(room_id)
-                        
-                        # ✅ Add all genes at once
-                        print(f"          📝 Adding {len(genes_to_add)} time slots to schedule...")
-                        for gene in genes_to_add:
-                            self.genes.append(gene)
-                            self.constraint_checker.add_slot(gene)
-                        
-                        # ✅ VERIFY: Count what was added
-                        added_count = len(genes_to_add)
-                        expected_count = parallel_slots * 2  # parallel_slots batches × 2 hours
-                        print(f"          ✅ Verification: Added {added_count}/{expected_count} slots")
-                        
-                        if added_count != expected_count:
-                            print(f"          ⚠️  WARNING: Expected {expected_count} slots but added {added_count}!")
+                    print(f"             Batch {batch_number} → {subject.subject_code} in {room_id}")
+                    
+                    # Create BOTH time slots (hour 0 and hour 1)
+                    for hour in range(2):
+                        gene = TimeSlot(
+                            day=day,
+                            period=start_period + hour,
+                            subject_code=subject.subject_code,
+                            subject_name=subject.subject_name,
+                            subject_type=subject.subject_type,
+                            faculty_id=subject.lab_faculty,
+                            section_id=section_id,
+                            room_id=room_id,
+                            batch_number=batch_number,
+                            is_theory=False
+                        )
+                        genes_to_add.append(gene)
                         
-                        scheduled_sessions += 1
-                        slot_found = True
+                        # ✅ DEBUG: Verify gene creation
+                        print(f"                 Created: Day {day}, P{start_period + hour}, "
+                            f"Batch {batch_number}, {subject.subject_code}")
+                    
+                    # Reserve lab room for both periods
+                    self.lab_room_masks[room_id] |= self.constraint_checker.block_mask(
+                        day, start_period, 2
+                    )
                 
-                if not slot_found:
-                    print(f"          ❌ Could not find slot for session {session_idx + 1}")
+                # ✅ Add all genes at once
+                print(f"          📝 Adding {len(genes_to_add)} time slots to schedule...")
+                for gene in genes_to_add:
+                    self.genes.append(gene)
+                    self.constraint_checker.add_slot(gene)
+                
+                # ✅ VERIFY: Count what was added
+                added_count = len(genes_to_add)
+                expected_count = parallel_slots * 2  # parallel_slots batches × 2 hours
+                print(f"          ✅ Verification: Added {added_count}/{expected_count} slots")
+                
+                if added_count != expected_count:
+                    print(f"          ⚠️  WARNING: Expected {expected_count} slots but added {added_count}!")
+                
+                scheduled_sessions += 1
             
             print(f"\n       📊 Summary: Scheduled {scheduled_sessions}/{sessions_needed} sessions")
 
@@ -488,143 +921,126 @@ class OptimizedTimetableChromosome:
 
         scheduled_count = 0
 
-        for subject in labs:
-            print(f"\n       📅 Scheduling {subject.subject_code}:")
-            slot_found = False
-
-            for day in range(self.days_per_week):
-                if slot_found:
-                    break
-
-                # Choose valid start periods
-                if day in project_days:
-                    valid_start_periods = [0, 2]  # Morning only
-                else:
-                    valid_start_periods = [0, 2, 4]  # Morning or afternoon
-
-                for start_period in valid_start_periods:
-                    if slot_found:
-                        break
-
-                    # Check section is free for 2 hours
-                    section_free = all(
-                        self.constraint_checker.is_available(
-                            day, p, '', section_id, '', True
-                        )
-                        for p in [start_period, start_period + 1]
-                    )
+        # Section free and enough rooms for every batch (one block per subject)
+        domain = self._lab_block_domain(section_id, [], project_days, num_batches)
 
-                    if not section_free:
-                        continue
-
-                    # Get available lab rooms
-                    available_rooms = self._get_available_lab_rooms(day, start_period, 2)
+        for subject_idx, subject in enumerate(labs):
+            print(f"\n       📅 Scheduling {subject.subject_code}:")
 
-                    # Need rooms equal to number of batches
-                    if len(available_rooms) < num_batches:
-                        continue
+            if subject_idx >= len(domain):
+                print(f"          ❌ Could not find slot for {subject.subject_code}")
+                continue
 
-                    print(f"          ✅ Found slot: Day {day}, Periods {start_period}-{start_period+1}")
+            day, start_period, available_rooms = domain[subject_idx]
 
-                    # Schedule all batches for same subject
-                    genes_to_add = []
+            print(f"          ✅ Found slot: Day {day}, Periods {start_period}-{start_period+1}")
 
-                    for batch_num in range(1, num_batches + 1):
-                        room_id = available_rooms[batch_num - 1]
+            # Schedule all batches for same subject
+            genes_to_add = []
 
-                        print(f"             Batch {batch_num} → {subject.subject_code} in {room_id}")
+            for batch_num in range(1, num_batches + 1):
+                room_id = available_rooms[batch_num - 1]
 
-                        # Create time slots for both hours
-                        for hour in range(2):
-                            gene = TimeSlot(
-                                day=day,
-                                period=start_period + hour,
-                                subject_code=subject.subject_code,
-                                subject_name=subject.subject_name,
-                                subject_type=subject.subject_type,
-                                faculty_id=subject.lab_faculty,
-                                section_id=section_id,
-                                room_id=room_id,
-                                batch_number=batch_num,
-                                is_theory=False
-                            )
-                            genes_to_add.append(gene)
+                print(f"             Batch {batch_num} → {subject.subject_code} in {room_id}")
 
-                        # Reserve lab room
-                        self.lab_usage_tracker[(day, start_period)].add(room_id)
-                        self.lab_usage_tracker[(day, start_period + 1)].add(room_id)
+                # Create time slots for both hours
+                for hour in range(2):
+                    gene = TimeSlot(
+                        day=day,
+                        period=start_period + hour,
+                        subject_code=subject.subject_code,
+                        subject_name=subject.subject_name,
+                        subject_type=subject.subject_type,
+                        faculty_id=subject.lab_faculty,
+                        section_id=section_id,
+                        room_id=room_id,
+                        batch_number=batch_num,
+                        is_theory=False
+                    )
+                    genes_to_add.append(gene)
 
-                    # Add all genes
-                    for gene in genes_to_add:
-                        self.genes.append(gene)
-                        self.constraint_checker.add_slot(gene)
+                # Reserve lab room
+                self.lab_room_masks[room_id] |= self.constraint_checker.block_mask(
+                    day, start_period, 2
+                )
 
-                    scheduled_count += 1
-                    slot_found = True
+            # Add all genes
+            for gene in genes_to_add:
+                self.genes.append(gene)
+                self.constraint_checker.add_slot(gene)
 
-            if not slot_found:
-                print(f"          ❌ Could not find slot for {subject.subject_code}")
+            scheduled_count += 1
 
         print(f"\n       📊 Summary: Scheduled {scheduled_count}/{len(labs)} subjects")
 
-    def _validate_parallel_lab_slot(self, day: int, start_period: int,
-                                    section_id: str, labs: List[Subject],
-                                    num_parallel: int) -> bool:
-        """CSP validation for parallel lab scheduling"""
-        # Check if enough lab rooms available
-        available_rooms = self._get_available_lab_rooms(day, start_period, 2)
-        if len(available_rooms) < num_parallel:
-            return False
+    def _lab_block_domain(self, section_id: str, faculty_ids: List[str],
+                          project_days: set, rooms_needed: int) -> List[Tuple[int, int, List[str]]]:
+        """
+        CSP forward checking for 2-hour lab blocks of one section.
+        Returns every (day, start_period, free_lab_rooms) where the section
+        and all given faculties are free and at least rooms_needed lab
+        rooms are open. Days with a project keep their afternoon for it.
+        """
+        checker = self.constraint_checker
+        busy = checker.section_masks.get(section_id, 0)
+        for faculty_id in faculty_ids:
+            busy |= checker.faculty_masks.get(faculty_id, 0)
+        
+        # Every start whose two periods are both free, in one mask
+        free = ~busy
+        starts = self.lab_start_slot_mask & free & (free >> 1)
+        for day in project_days:
+            # ✅ SMART: a project day only has the morning free for labs
+            starts &= ~(self.afternoon_slot_mask & checker.block_mask(day, 0, self.periods_per_day))
+        
+        domain = []
+        for day, start_period in self._iter_slots(starts):
+            available_rooms = self._get_available_lab_rooms(day, start_period, 2)
+            if len(available_rooms) >= rooms_needed:
+                domain.append((day, start_period, available_rooms))
+        return domain
+    
+    def _schedule_theory_with_csp(self, subject_idx: int,
+                                  day_periods: Dict[Tuple[str, int], int],
+                                  day_subjects: Dict[Tuple[str, int], Set[str]]):
+        """
+        Schedule theory using CSP - MORNING ONLY, afternoon as last resort
+        day_periods / day_subjects: per-(section, day) period bitmask and
+        subject codes, updated here when the hour is placed
+        Returns the gene placed, or None if the hour could not be placed.
+        """
+        subject = self.subjects[subject_idx]
+        if not subject.theory_faculty:
+            return None
         
-        # Check all faculty availability
-        for lab in labs:
-            for period in [start_period, start_period + 1]:
-                if not self.constraint_checker.is_available(
-                    day, period, lab.lab_faculty, '', '', False
-                ):
-                    return False
+        section_id = self.subject_section_ids[subject_idx]
+        classroom = self.subject_classrooms[subject_idx]
         
-        # Check section not busy
-        for period in [start_period, start_period + 1]:
-            if not self.constraint_checker.is_available(
-                day, period, '', section_id, '', True
-            ):
-                return False
+        # Every slot the faculty, section or classroom already occupies
+        busy = self.constraint_checker.busy_mask(
+            subject.theory_faculty, section_id, classroom, True
+        )
         
-        return True
-    
-    def _schedule_theory_with_csp(self, subject: Subject, section_id: str):
-        """Schedule theory using CSP - MORNING ONLY, afternoon as last resort"""
-        if not subject.theory_faculty:
-            return
+        # One score row per day from the table; the repeat penalty is per day too
+        days = range(self.days_per_week)
+        day_scores = [self.slot_score_table[day_periods[(section_id, day)]] for day in days]
+        repeats = [100 if subject.subject_code in day_subjects[(section_id, day)] else 0
+                   for day in days]
         
-        classroom = self.sections[section_id].classroom
-        best_slot = None
-        best_score = -1000
+        def slot_score(slot):
+            day, period = slot
+            return day_scores[day][period] - repeats[day]
         
         # ✅ PHASE 1: Try ONLY morning slots (strict)
-        for day in range(self.days_per_week):
-            for period in self.morning_periods:  # [0, 1, 2, 3]
-                if self.constraint_checker.is_available(
-                    day, period, subject.theory_faculty, section_id, classroom, True
-                ):
-                    score = self._calculate_slot_score_csp(day, period, section_id, subject.subject_code)
-                    if score > best_score:
-                        best_score = score
-                        best_slot = (day, period)
+        # max keeps the first best slot in day-major order
+        best_slot = max(self._iter_slots(self.morning_slot_mask & ~busy),
+                        key=slot_score, default=None)
         
         # ✅ PHASE 2: ONLY if no morning slot found, try afternoon
         if best_slot is None:
             print(f"      ⚠️ No morning slot for {subject.subject_code}, trying afternoon...")
-            for day in range(self.days_per_week):
-                for period in self.afternoon_periods:  # [4, 5, 6]
-                    if self.constraint_checker.is_available(
-                        day, period, subject.theory_faculty, section_id, classroom, True
-                    ):
-                        score = self._calculate_slot_score_csp(day, period, section_id, subject.subject_code) - 200  # Heavy penalty
-                        if score > best_score:
-                            best_score = score
-                            best_slot = (day, period)
+            best_slot = max(self._iter_slots(self.afternoon_slot_mask & ~busy),
+                            key=slot_score, default=None)
         
         if best_slot:
             day, period = best_slot
@@ -636,248 +1052,388 @@ class OptimizedTimetableChromosome:
             )
             self.genes.append(gene)
             self.constraint_checker.add_slot(gene)
-        else:
-            print(f"      ❌ Could not schedule theory for {subject.subject_code}")
-    
-    def _calculate_slot_score_csp(self, day: int, period: int, section_id: str, subject_code: str) -> int:
-        """Enhanced scoring for CSP slot selection"""
-        score = 100
-        
-        # Prefer continuous slots
-        day_periods = sorted([g.period for g in self.genes if g.section_id == section_id and g.day == day])
-        
-        if day_periods:
-            if period == max(day_periods) + 1 or period == min(day_periods) - 1:
-                score += 80  # Bonus for continuity
-            else:
-                min_gap = min(abs(period - p) for p in day_periods)
-                score -= min_gap * 15
-        
-        # Avoid same subject twice on same day
-        if any(g.subject_code == subject_code for g in self.genes if g.section_id == section_id and g.day == day):
-            score -= 100
-        
-        # Prefer starting from period 0
-        if period == 0:
-            score += 50
+            day_periods[(section_id, day)] |= 1 << period
+            day_subjects[(section_id, day)].add(subject.subject_code)
+            return gene
         
-        return score
+        print(f"      ❌ Could not schedule theory for {subject.subject_code}")
+        return None
     
     def _get_available_lab_rooms(self, day: int, start_period: int, duration: int = 2) -> List[str]:
-        """Get available lab rooms for given time range"""
-        available = []
-        for room_id in self.lab_rooms.keys():
-            if all(
-                room_id not in self.lab_usage_tracker[(day, p)]
-                for p in range(start_period, start_period + duration)
-            ):
-                available.append(room_id)
-        return available
+        """Get available lab rooms for given time range (one mask test per room)"""
+        block = self.constraint_checker.block_mask(day, start_period, duration)
+        lab_room_masks = self.lab_room_masks
+        return [room_id for room_id in self.lab_rooms if not lab_room_masks.get(room_id, 0) & block]
     
     def calculate_fitness(self):
-        """Fast fitness calculation using constraint checker"""
+        """
+        Fast fitness calculation from a single fused metrics pass.
+        Stops early once hard constraints alone clamp fitness to 0, so
+        raw_fitness is then only an upper bound.
+        """
+        return self.set_fitness_from_metrics(self._compute_all_metrics(early_exit=True))
+
+    def set_fitness_from_metrics(self, metrics) -> float:
+        """Apply METRIC_WEIGHTS to raw violation counts and store the fitness"""
         fitness = 1000
+        for key in METRIC_KEYS:
+            fitness -= metrics[key] * METRIC_WEIGHTS[key]
+
+        self.raw_fitness = fitness
+        self.fitness = max(0, fitness)
+        return self.fitness
+    
+    def _build_arrays(self) -> Tuple[np.ndarray, ...]:
+        """
+        Structure-of-arrays view of the genes as np.int16 columns:
+        day, period, faculty, section, room, subject, batch, is_theory,
+        is_project (the last two as bool). String ids are interned
+        through the chromosome's *_to_idx tables. Cached until
+        genes_changed(); callers must not write to the returned arrays.
+        """
+        if self._arrays is not None:
+            return self._arrays
+
+        faculty_idx = self.faculty_to_idx
+        section_idx = self.section_to_idx
+        room_idx = self.room_to_idx
+        subject_idx = self.subject_to_idx
+
+        cols = np.array([
+            (g.day, g.period, faculty_idx[g.faculty_id], section_idx[g.section_id],
+             room_idx[g.room_id], subject_idx[g.subject_code],
+             g.batch_number, g.is_theory, _is_project_type(g.subject_type))
+            for g in self.genes
+        ], dtype=np.int16).reshape(-1, 9)
+
+        self._arrays = (cols[:, 0], cols[:, 1], cols[:, 2], cols[:, 3], cols[:, 4],
+                        cols[:, 5], cols[:, 6], cols[:, 7].astype(np.bool_),
+                        cols[:, 8].astype(np.bool_))
+        return self._arrays
+
+    def _compute_all_metrics(self, early_exit: bool = False) -> Dict[str, int]:
+        """
+        Compute every constraint metric over the structure-of-arrays gene
+        view, in the compiled kernel when Numba is installed and with
+        vectorized NumPy operations otherwise.
+        Returns a dict of raw violation counts (before weighting):
+        faculty/section/room conflicts, lab & project continuity,
+        gaps, theory distribution, theory in afternoon, sparse days
+        and Saturday labs.
+        early_exit: leave the metrics not computed yet at 0 once the
+        penalties so far push fitness to 0 (before lab continuity and
+        theory distribution; the NumPy path also checks right after the
+        hard conflicts)
+        """
+        if not self.genes:
+            return dict.fromkeys(METRIC_KEYS, 0)
+
+        columns = self._build_arrays()
+        if NUMBA_AVAILABLE:
+            values = metrics_kernel(*columns, self.afternoon_mask,
+                                     self.days_per_week, self.periods_per_day,
+                                     WEIGHT_VECTOR, early_exit)
+            return dict(zip(METRIC_KEYS, values.tolist()))
+        return self._vectorized_metrics(*columns, early_exit=early_exit)
+
+    def _vectorized_metrics(self, day, period, faculty, section, room, subject, batch,
+                            is_theory, is_project, early_exit: bool = False) -> Dict[str, int]:
+        """NumPy implementation of the constraint metrics (no Numba)"""
+        metrics = dict.fromkeys(METRIC_KEYS, 0)
+        days, periods = self.days_per_week, self.periods_per_day
+        num_sections = int(section.max()) + 1
+        num_subjects = int(subject.max()) + 1
+        lab = ~is_theory
+
+        # Hard constraints: dense (resource, day, period) booking counts
+        section_counts = _dense_counts((num_sections, days, periods), section, day, period)
+        metrics['faculty_conflicts'] = _overbooked(
+            _dense_counts((int(faculty.max()) + 1, days, periods), faculty, day, period)
+        )
+        metrics['section_conflicts'] = _overbooked(section_counts)
+        metrics['room_conflicts'] = _overbooked(_dense_counts(
+            (int(room.max()) + 1, days, periods), room[is_theory], day[is_theory], period[is_theory]
+        ))
+
+        # Heaviest penalties first. Gaps, the only penalty that can be
+        # negative, are at least minus two per section over-booking.
+        if early_exit:
+            hard_penalty = (
+                metrics['faculty_conflicts'] * METRIC_WEIGHTS['faculty_conflicts']
+                + metrics['section_conflicts'] * (METRIC_WEIGHTS['section_conflicts']
+                                                  - 2 * METRIC_WEIGHTS['gaps'])
+                + metrics['room_conflicts'] * METRIC_WEIGHTS['room_conflicts']
+            )
+            if hard_penalty >= 1000:
+                return metrics
 
-        # Hard constraints (cached in constraint checker)
-        faculty_conflicts = self._count_conflicts_fast('faculty')
-        section_conflicts = self._count_conflicts_fast('section')
-        room_conflicts = self._count_conflicts_fast('room')
+        # Projects must fill the afternoon block exactly
+        project_counts = _dense_counts(
+            (num_sections, days, periods), section[is_project], day[is_project], period[is_project]
+        )
+        total = project_counts.sum(axis=2)
+        metrics['project_continuity'] = int(np.count_nonzero(
+            (total > 0) & ((total != 3) | ((project_counts > 0) != self.afternoon_mask).any(axis=2))
+        ))
+
+        # Gaps and sparse days from the per-(section, day) period counts
+        total = section_counts.sum(axis=2)
+        span = _period_span(section_counts > 0)
+        has_classes = total > 0
+        metrics['gaps'] = int(((span - total) * 2)[has_classes].sum())
+        metrics['sparse_days'] = int((3 - total[has_classes & (total <= 2)]).sum())
+
+        # Theory in afternoon (✅ triple penalty) and labs on Saturday
+        metrics['theory_afternoon'] = int(np.count_nonzero(
+            is_theory & ~is_project & self.afternoon_mask[period]
+        )) * 3
+        metrics['saturday_labs'] = int(np.count_nonzero(lab & ~is_project & (day == 5)))
+
+        # Lab continuity and theory spread only add penalties
+        if early_exit and fitness_bound(np.array([metrics[k] for k in METRIC_KEYS]), WEIGHT_VECTOR) <= 0:
+            return metrics
+
+        # Lab blocks must be continuous: no repeated period and no hole.
+        # One sort by (subject, section, batch, day) block, then period;
+        # inside a block every period must be exactly one after the last.
+        block_key = np.ravel_multi_index(
+            (subject[lab], section[lab], batch[lab], day[lab]),
+            (num_subjects, num_sections, int(batch.max()) + 1, days)
+        )
+        lab_period = period[lab]
+        order = np.lexsort((lab_period, block_key))
+        block_key, lab_period = block_key[order], lab_period[order]
+        broken_step = (block_key[1:] == block_key[:-1]) & (np.diff(lab_period) != 1)
+        broken = block_key[1:][broken_step]  # sorted, one entry per bad step
+        metrics['lab_continuity'] = int(np.count_nonzero(broken[1:] != broken[:-1])) + (broken.size > 0)
+
+        # Theory not concentrated on one day
+        theory_counts = _dense_counts(
+            (num_subjects, num_sections, days), subject[is_theory], section[is_theory], day[is_theory]
+        )
+        metrics['theory_distribution'] = int(np.maximum(theory_counts - 2, 0).sum())
 
-        fitness -= faculty_conflicts * 500
-        fitness -= section_conflicts * 500
-        fitness -= room_conflicts * 400
+        return metrics
 
-        # Lab continuity
-        fitness -= self._check_lab_continuity() * 200
+    def swap_theory_slots(self, num_swaps: int, rng: np.random.Generator = None):
+        """
+        Heavy mutation: swap the (day, period) of random pairs of theory
+        genes. Lab and project blocks are left untouched.
+        """
+        genes = self.genes
+        theory_idx = [i for i, g in enumerate(genes) if g.is_theory]
+        n = len(theory_idx)
+        if n < 2:
+            return
 
-        # Project constraints
-        fitness -= self._check_project_continuity() * 300
+        # All pairs drawn in one batch; the offset keeps each pair distinct
+        rng = rng or np.random.default_rng()
+        first = rng.integers(0, n, num_swaps)
+        second = (first + rng.integers(1, n, num_swaps)) % n
 
-        # Soft constraints
-        fitness -= self._check_gaps() * 100
-        fitness -= self._check_theory_distribution() * 50
-        fitness -= self._penalize_theory_afternoon() * 100
-        fitness -= self._penalize_sparse_days() * 30
-        fitness -= self._penalize_saturday_labs() * 50  # ✅ VTU Saturday holiday penalty
+        for a, b in zip(first.tolist(), second.tolist()):
+            i, j = theory_idx[a], theory_idx[b]
+            g1, g2 = genes[i], genes[j]
+            genes[i], genes[j] = g1.moved(g2.day, g2.period), g2.moved(g1.day, g1.period)
 
-        self.fitness = max(0, fitness)
-        return self.fitness
-    
-    def _count_conflicts_fast(self, resource_type: str) -> int:
-        """Fast conflict counting using CSP checker"""
-        conflicts = 0
-        slot_counts = defaultdict(int)
-        
-        if resource_type == 'faculty':
-            for gene in self.genes:
-                slot_counts[(gene.faculty_id, gene.day, gene.period)] += 1
-        elif resource_type == 'section':
-            for gene in self.genes:
-                slot_counts[(gene.section_id, gene.day, gene.period)] += 1
-        elif resource_type == 'room':
-            for gene in self.genes:
-                if gene.is_theory:
-                    slot_counts[(gene.room_id, gene.day, gene.period)] += 1
-        
-        for count in slot_counts.values():
-            if count > 1:
-                conflicts += (count - 1)
-        
-        return conflicts
-    
-    def _check_lab_continuity(self) -> int:
-        """Check 2-hour lab blocks are continuous"""
-        violations = 0
-        lab_sessions = defaultdict(list)
-        
-        for gene in self.genes:
-            if not gene.is_theory:
-                key = (gene.subject_code, gene.section_id, gene.batch_number, gene.day)
-                lab_sessions[key].append(gene.period)
-        
-        for periods in lab_sessions.values():
-            if len(periods) >= 2:
-                periods_sorted = sorted(periods)
-                for i in range(len(periods_sorted) - 1):
-                    if periods_sorted[i+1] - periods_sorted[i] != 1:
-                        violations += 1
-                        break
-        
-        return violations
-    
-    def _check_project_continuity(self) -> int:
-        """Check project 3-hour blocks"""
-        violations = 0
-        project_slots = defaultdict(list)
-        
-        for gene in self.genes:
-            if VTUSubjectValidator.is_project(gene.subject_type):
-                project_slots[(gene.section_id, gene.day)].append(gene.period)
-        
-        for periods in project_slots.values():
-            if len(periods) != 3 or set(periods) != set(self.afternoon_periods):
-                violations += 1
-        
-        return violations
-    
-    def _check_gaps(self) -> int:
-        """Penalize gaps in schedule"""
-        violations = 0
-        section_daily = defaultdict(list)
-        
+        self.genes_changed()
+        self.rebuild_constraint_checker()
+
+    def column_crossover(self, other: 'OptimizedTimetableChromosome',
+                         columns: Set[Tuple[str, int]]) -> 'OptimizedTimetableChromosome':
+        """
+        Child with this chromosome's schedule except for the theory hours
+        of the given (section, day) columns, which come from `other`; labs
+        and projects stay put. Every subject keeps this chromosome's weekly
+        hour count, and the child gains no section double-booking:
+        - a subject the swap leaves with extra hours drops some, outside
+          the inherited columns first
+        - an inherited hour whose section slot is taken (or that the
+          master schedule blocks) is left out
+        - hours still missing go to a slot their section, faculty and room
+          all leave free: their own slot here if possible, else one the
+          drops freed, else the first free morning (then afternoon) slot
+        With no such slot left the child is a plain copy of this chromosome.
+        """
+        kept, taken_out = [], []
         for gene in self.genes:
-            section_daily[(gene.section_id, gene.day)].append(gene.period)
-        
-        for periods in section_daily.values():
-            if not periods:
+            if gene.is_theory and (gene.section_id, gene.day) in columns:
+                taken_out.append(gene)
+            else:
+                kept.append(gene)
+        brought_in = [gene for gene in other.genes
+                      if gene.is_theory and (gene.section_id, gene.day) in columns]
+        
+        # Hours per (section, subject) the child may still take: those taken
+        # out, plus any dropped below. A subject with more brought in than
+        # taken out drops the difference from its kept hours.
+        room = Counter((gene.section_id, gene.subject_code) for gene in taken_out)
+        extra = Counter((gene.section_id, gene.subject_code) for gene in brought_in)
+        extra -= room
+        periods_per_day = self.periods_per_day
+        dropped = []
+        freed = defaultdict(int)  # section -> slot bits of the dropped hours
+        if extra:
+            genes = []
+            for gene in kept:
+                key = (gene.section_id, gene.subject_code)
+                if gene.is_theory and extra[key] > 0:
+                    extra[key] -= 1
+                    room[key] += 1
+                    dropped.append(gene)
+                    freed[gene.section_id] |= 1 << (gene.day * periods_per_day + gene.period)
+                else:
+                    genes.append(gene)
+            kept = genes
+        
+        child = self.clone(kept)
+        checker = child.constraint_checker  # includes the master schedule
+        master = self.master_occupancy.checker
+        section_masks = checker.section_masks
+        for gene in brought_in:
+            key = (gene.section_id, gene.subject_code)
+            bit = 1 << (gene.day * periods_per_day + gene.period)
+            if (room[key] <= 0 or section_masks.get(gene.section_id, 0) & bit
+                    or (master.faculty_masks.get(gene.faculty_id, 0)
+                        | master.room_masks.get(gene.room_id, 0)) & bit):
                 continue
-            periods_sorted = sorted(periods)
-            expected_span = periods_sorted[-1] - periods_sorted[0] + 1
-            violations += (expected_span - len(periods)) * 2
-        
-        return violations
-    
-    def _check_theory_distribution(self) -> int:
-        """Check theory not concentrated on one day"""
-        violations = 0
-        theory_counts = defaultdict(lambda: defaultdict(int))
-        
-        for gene in self.genes:
-            if gene.is_theory:
-                theory_counts[(gene.subject_code, gene.section_id)][gene.day] += 1
-        
-        for daily_counts in theory_counts.values():
-            for count in daily_counts.values():
-                if count > 2:
-                    violations += count - 2
-        
-        return violations
-    
-    def _penalize_theory_afternoon(self) -> int:
-        """Penalize theory in afternoon - HEAVY penalty"""
-        count = sum(1 for g in self.genes 
-                if g.is_theory 
-                and not VTUSubjectValidator.is_project(g.subject_type)
-                and g.period in self.afternoon_periods)
-        return count * 3  # ✅ Changed from * 1 to * 3 (triple penalty)
+            child.genes.append(gene)
+            checker.add_slot(gene)
+            room[key] -= 1
+        
+        # The taken-out and dropped hours are the templates of the missing ones
+        for gene in taken_out + dropped:
+            key = (gene.section_id, gene.subject_code)
+            if room[key] <= 0:
+                continue
+            free = self.week_slot_mask & ~checker.busy_mask(
+                gene.faculty_id, gene.section_id, gene.room_id, True
+            )
+            if not free:
+                return self.clone()
+            own = 1 << (gene.day * periods_per_day + gene.period)
+            slots = (free & own or free & freed[gene.section_id]
+                     or free & self.morning_slot_mask or free)
+            gene = gene.moved(*self._nth_slot(slots, 0))
+            child.genes.append(gene)
+            checker.add_slot(gene)
+            room[key] -= 1
+        
+        child.genes_changed()
+        return child
     
-    def _penalize_sparse_days(self) -> int:
-        """Penalize days with very few classes"""
-        violations = 0
-        daily_counts = defaultdict(lambda: defaultdict(int))
+    def guided_mutation(self, rng: np.random.Generator = None,
+                        temperature: float = 30.0) -> bool:
+        """
+        Relocate one theory gene, preferring genes in a hard conflict, to a
+        slot where its faculty, section and room are all free. The move is
+        kept if it does not lower fitness, or else with Metropolis
+        probability exp(delta / temperature). Returns True if kept.
+        """
+        pack, theory, movable = self._tabu_inputs()
+        if not movable.size:
+            return False
 
-        for gene in self.genes:
-            daily_counts[gene.section_id][gene.day] += 1
+        busy = build_bookings(pack, theory, self.days_per_week, self.periods_per_day)
+
+        # Movable genes whose slot is double-booked on any resource
+        rows = pack[movable]
+        slot = (rows[:, COL_DAY], rows[:, COL_PERIOD])
+        conflicting = (
+            (busy[0][(rows[:, COL_FACULTY],) + slot] > 1)
+            | (busy[1][(rows[:, COL_SECTION],) + slot] > 1)
+            | (busy[2][(rows[:, COL_ROOM],) + slot] > 1)
+        )
+        in_conflict = conflicting.any()
+        candidates = movable[conflicting] if in_conflict else movable
+
+        rng = rng or np.random.default_rng()
+        idx = int(candidates[rng.integers(len(candidates))])
+        gene = self.genes[idx]
+        busy_slots = self.constraint_checker.busy_mask(
+            gene.faculty_id, gene.section_id, gene.room_id, gene.is_theory
+        )
+        free = self.week_slot_mask & ~busy_slots
+        num_free = free.bit_count()
+        if not num_free:
+            return False
 
-        for counts in daily_counts.values():
-            for count in counts.values():
-                if count <= 2:
-                    violations += (3 - count)
+        day, period = self._nth_slot(free, int(rng.integers(num_free)))
+        delta = slot_move_delta(pack, theory, busy, self.afternoon_mask, WEIGHT_VECTOR,
+                                idx, day, period)
+        if delta < 0 and rng.random() >= np.exp(delta / temperature):
+            return False
 
-        return violations
+        if in_conflict:
+            # Clearing a shared slot bit would free it for the other gene too
+            self.genes[idx] = gene.moved(day, period)
+            self.genes_changed()
+            self.rebuild_constraint_checker()
+        else:
+            self._move_gene(idx, day, period)
+        return True
 
-    def _penalize_saturday_labs(self) -> int:
+    def _move_gene(self, idx: int, day: int, period: int):
         """
-        Penalize labs scheduled on Saturday (day 5).
-        VTU has 1st and 3rd Saturday as holidays, so minimize Saturday usage.
-        Projects are exempt from this penalty.
+        Move gene idx to (day, period), updating the constraint checker bits
+        in place. Only exact while no other gene shares the old slot on the
+        gene's faculty, section or room (otherwise rebuild the checker).
         """
-        count = sum(1 for g in self.genes
-                if not g.is_theory  # Lab sessions only
-                and not VTUSubjectValidator.is_project(g.subject_type)  # Exclude projects
-                and g.day == 5)  # Saturday (assuming Monday=0)
-        return count
+        gene = self.genes[idx]
+        self.constraint_checker.remove_slot(gene)
+        self.genes[idx] = gene = gene.moved(day, period)
+        self.constraint_checker.add_slot(gene)
+        self.genes_changed()
 
     def tabu_local_search(self, max_iterations: int = 50, tabu_size: int = 20):
-        """Enhanced local search with tabu list"""
-        tabu_list = []
-        current_fitness = self.calculate_fitness()
-        
-        for iteration in range(max_iterations):
-            if current_fitness >= 1000:
-                break
-            
-            # Find best non-tabu move
-            best_move = None
-            best_fitness = current_fitness
-            
-            # Try swapping random theory slots
-            for _ in range(10):
-                if len(self.genes) < 2:
-                    break
-                
-                idx1 = random.randint(0, len(self.genes) - 1)
-                idx2 = random.randint(0, len(self.genes) - 1)
-                
-                if idx1 == idx2 or not self.genes[idx1].is_theory or not self.genes[idx2].is_theory:
-                    continue
-                
-                move = (idx1, idx2)
-                if move in tabu_list:
-                    continue
-                
-                # Try swap
-                self.genes[idx1], self.genes[idx2] = self.genes[idx2], self.genes[idx1]
-                self.constraint_checker.rebuild_from_genes(self.genes)
-                
-                new_fitness = self.calculate_fitness()
-                
-                if new_fitness > best_fitness:
-                    best_fitness = new_fitness
-                    best_move = move
-                
-                # Undo swap
-                self.genes[idx1], self.genes[idx2] = self.genes[idx2], self.genes[idx1]
-            
-            if best_move:
-                idx1, idx2 = best_move
-                self.genes[idx1], self.genes[idx2] = self.genes[idx2], self.genes[idx1]
-                self.constraint_checker.rebuild_from_genes(self.genes)
-                current_fitness = best_fitness
-                
-                tabu_list.append(best_move)
-                if len(tabu_list) > tabu_size:
-                    tabu_list.pop(0)
+        """
+        Tabu local search over (day, period) swaps and single-gene moves
+        of theory genes. Runs on the packed int representation and scores each candidate
+        by its fitness delta instead of a full fitness recomputation.
+        """
+        # Exact raw fitness (no early exit): deltas are accumulated onto it
+        self.set_fitness_from_metrics(self._compute_all_metrics())
+        if len(self.genes) < 2:
+            return
+
+        pack, theory, movable = self._tabu_inputs()
+        if tabu_search(pack, theory, movable, self._master_blocked(pack), self.raw_fitness,
+                       self.afternoon_mask, WEIGHT_VECTOR, self.days_per_week,
+                       self.periods_per_day, max_iterations, tabu_size):
+            self._unpack_slots(pack[:, [COL_DAY, COL_PERIOD]], movable)
+
+    def _tabu_inputs(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Packed genes, theory flags and the movable (non-project theory)
+        gene indices, all from one _build_arrays pass. The packed genes are
+        an (N, 7) int32 array with columns subject, section, batch, day,
+        period, faculty, room (strings interned to int ids).
+        """
+        day, period, faculty, section, room, subject, batch, theory, project = self._build_arrays()
+        pack = np.stack([subject, section, batch, day, period, faculty, room], axis=1).astype(np.int32)
+        movable = np.flatnonzero(theory & ~project)
+        return pack, theory, movable
+
+    def _master_blocked(self, pack: np.ndarray) -> np.ndarray:
+        """
+        Per packed gene, the slot bits the master schedule holds for its
+        faculty, section or room (the kernels never move it onto those)
+        """
+        return (self.master_faculty_slots[pack[:, COL_FACULTY]]
+                | self.master_section_slots[pack[:, COL_SECTION]]
+                | self.master_room_slots[pack[:, COL_ROOM]])
+
+    def _unpack_slots(self, slots: np.ndarray, movable: np.ndarray):
+        """Write improved (day, period) rows of the movable genes back"""
+        genes = self.genes
+        rows = slots.tolist()
+        for idx in movable.tolist():
+            day, period = rows[idx]
+            gene = genes[idx]
+            if gene.day != day or gene.period != period:
+                genes[idx] = gene.moved(day, period)
+        self.genes_changed()
+        self.rebuild_constraint_checker()
 
     def repair_lab_continuity_post_generation(self):
         """
@@ -887,27 +1443,32 @@ class OptimizedTimetableChromosome:
         print("\n🔧 Post-Generation Lab Continuity Repair...")
         
         # Step 1: Identify broken lab sessions
+        # Sessions hold gene indices: a repaired gene is replaced in the list
+        genes = self.genes
         lab_sessions = defaultdict(list)
         
-        for idx, gene in enumerate(self.genes):
+        for idx, gene in enumerate(genes):
             if not gene.is_theory:  # Only labs
                 key = (gene.subject_code, gene.section_id, gene.batch_number, gene.day)
-                lab_sessions[key].append({'index': idx, 'gene': gene})
+                lab_sessions[key].append(idx)
+        
+        # 2-hour blocks whose periods are not continuous
+        broken_sessions = [
+            (key, session) for key, session in lab_sessions.items()
+            if len(session) == 2
+            and abs(genes[session[0]].period - genes[session[1]].period) != 1
+        ]
         
         repairs_attempted = 0
         repairs_successful = 0
+        # Only needed (and only built) when there is something to repair
+        occupancy = self._build_slot_occupancy() if broken_sessions else None
         
-        for key, session_genes in lab_sessions.items():
+        for key, session in broken_sessions:
             subject_code, section_id, batch_number, day = key
-            
-            if len(session_genes) != 2:  # Should be 2-hour block
-                continue
-            
-            periods = sorted([g['gene'].period for g in session_genes])
-            
-            # Check if continuous
-            if periods[1] - periods[0] == 1:
-                continue  # Already continuous, skip
+            idx1, idx2 = session
+            gene1, gene2 = genes[idx1], genes[idx2]
+            periods = sorted((gene1.period, gene2.period))
             
             # Found broken lab session!
             repairs_attempted += 1
@@ -915,9 +1476,6 @@ class OptimizedTimetableChromosome:
             print(f"     Current periods: {periods[0]}, {periods[1]} (gap detected)")
             
             # Step 2: Try to find continuous 2-hour slot
-            gene1 = session_genes[0]['gene']
-            gene2 = session_genes[1]['gene']
-            
             # Get faculty and room info
             faculty_id = gene1.faculty_id
             room_id = gene1.room_id
@@ -925,18 +1483,21 @@ class OptimizedTimetableChromosome:
             # Search for available continuous slot
             new_slot_found = False
             
+            # Lift the broken session out so it does not block its own move
+            for gene in (gene1, gene2):
+                self._book_slot(occupancy, gene, -1)
+            
             # Try same day first
             for start_period in [0, 2, 4]:  # 2-hour blocks: 0-1, 2-3, 4-5
                 if self._is_continuous_slot_available(
-                    day, start_period, faculty_id, section_id, room_id, 
-                    exclude_indices=[g['index'] for g in session_genes]
+                    occupancy, day, start_period, faculty_id, section_id, room_id
                 ):
                     # Found valid continuous slot!
                     print(f"     ✅ Found continuous slot: Day {day}, Periods {start_period}-{start_period+1}")
                     
                     # Update the genes
-                    self.genes[session_genes[0]['index']].period = start_period
-                    self.genes[session_genes[1]['index']].period = start_period + 1
+                    genes[idx1] = gene1 = gene1.moved(day, start_period)
+                    genes[idx2] = gene2 = gene2.moved(day, start_period + 1)
                     
                     repairs_successful += 1
                     new_slot_found = True
@@ -950,20 +1511,18 @@ class OptimizedTimetableChromosome:
                     
                     for start_period in [0, 2, 4]:
                         if self._is_continuous_slot_available(
-                            new_day, start_period, faculty_id, section_id, room_id,
-                            exclude_indices=[g['index'] for g in session_genes]
+                            occupancy, new_day, start_period, faculty_id, section_id, room_id
                         ):
                             print(f"     ✅ Found continuous slot: Day {new_day}, Periods {start_period}-{start_period+1}")
                             
                             # Update the genes (including day change)
-                            self.genes[session_genes[0]['index']].day = new_day
-                            self.genes[session_genes[0]['index']].period = start_period
-                            self.genes[session_genes[1]['index']].day = new_day
-                            self.genes[session_genes[1]['index']].period = start_period + 1
+                            genes[idx1] = gene1 = gene1.moved(new_day, start_period)
+                            genes[idx2] = gene2 = gene2.moved(new_day, start_period + 1)
                             
-                            # Update lab room tracker
-                            self.lab_usage_tracker[(new_day, start_period)].add(room_id)
-                            self.lab_usage_tracker[(new_day, start_period + 1)].add(room_id)
+                            # Update lab room masks
+                            self.lab_room_masks[room_id] |= self.constraint_checker.block_mask(
+                                new_day, start_period, 2
+                            )
                             
                             repairs_successful += 1
                             new_slot_found = True
@@ -972,12 +1531,17 @@ class OptimizedTimetableChromosome:
                     if new_slot_found:
                         break
             
+            # Book the session back in at its (possibly new) slots
+            for gene in (gene1, gene2):
+                self._book_slot(occupancy, gene, 1)
+            
             if not new_slot_found:
                 print(f"     ❌ Could not find continuous slot for {subject_code} Batch {batch_number}")
         
         # Rebuild constraint checker after repairs
         if repairs_successful > 0:
-            self.constraint_checker.rebuild_from_genes(self.genes)
+            self.genes_changed()
+            self.rebuild_constraint_checker()
         
         print(f"\n  📊 Lab Repair Summary:")
         print(f"     Broken labs found: {repairs_attempted}")
@@ -986,52 +1550,376 @@ class OptimizedTimetableChromosome:
         
         return repairs_successful
 
-    def _is_continuous_slot_available(self, day, start_period, faculty_id, 
-                                   section_id, room_id, exclude_indices=None):
+    def _build_slot_occupancy(self) -> Counter:
+        """
+        Count bookings per (day, period, resource) over genes and master schedule
+        Keys are (day, period, 'faculty'|'section'|'room', id)
+        """
+        occupancy = self.master_occupancy.bookings.copy()
+        for gene in self.genes:
+            self._book_slot(occupancy, gene, 1)
+        return occupancy
+
+    @staticmethod
+    def _book_slot(occupancy: Counter, gene: TimeSlot, count: int):
+        """Add (count=1) or remove (count=-1) a gene's bookings"""
+        occupancy[(gene.day, gene.period, 'faculty', gene.faculty_id)] += count
+        occupancy[(gene.day, gene.period, 'section', gene.section_id)] += count
+        occupancy[(gene.day, gene.period, 'room', gene.room_id)] += count
+
+    def _is_continuous_slot_available(self, occupancy, day, start_period, faculty_id,
+                                   section_id, room_id):
         """
         Check if a continuous 2-hour slot is available
-        exclude_indices: Gene indices to ignore (the ones we're trying to move)
+        occupancy: counts from _build_slot_occupancy, with the genes being
+        moved already removed
         """
-        if exclude_indices is None:
-            exclude_indices = []
-        
-        # Check both periods
-        for period in [start_period, start_period + 1]:
-            # Check against existing genes (except the ones we're moving)
-            for idx, gene in enumerate(self.genes):
-                if idx in exclude_indices:
-                    continue  # Skip the genes we're trying to reschedule
+        for period in (start_period, start_period + 1):
+            if (occupancy[(day, period, 'faculty', faculty_id)]
+                    or occupancy[(day, period, 'section', section_id)]
+                    or occupancy[(day, period, 'room', room_id)]):
+                return False
+        
+        return True  # Slot is available!
+
+# ===========================
+# PARALLEL POPULATION WORKERS
+# ===========================
+
+# Workers are spawned, not forked: the scheduler runs inside a threaded
+# web server, and forking a multi-threaded process is not safe
+_POOL_CONTEXT = get_context("spawn")
+
+_worker_context = None
+_worker_template = None
+
+
+def _init_worker(context: ScheduleContext):
+    """Pool initializer: ship the shared context to each worker only once"""
+    global _worker_context, _worker_template
+    _worker_context = context
+    _worker_template = None
+
+
+@contextmanager
+def worker_pool(context: ScheduleContext, max_workers: int):
+    """
+    Process pool kept alive for a whole GA run, so the spawn start-up
+    is paid once; workers hold the shared context, so tasks only carry
+    per-chromosome arrays. Yields None (run tasks in-process) when a
+    single process would be used anyway.
+    max_workers: cap on the processes spawned, each of which imports the
+    scheduler and loads Numba; keep it small, not the task count
+    """
+    processes = min(cpu_count(), max_workers)
+    if processes <= 1:
+        _init_worker(context)
+        yield None
+        return
+
+    with _POOL_CONTEXT.Pool(processes, initializer=_init_worker, initargs=(context,)) as pool:
+        yield pool
+
+
+def _init_one(job) -> OptimizedTimetableChromosome:
+    """Build and score one CSP-seeded chromosome (runs in a worker process)"""
+    seed, backtracking = job
+    chromosome = OptimizedTimetableChromosome.from_context(_worker_context)
+    # Per-task generator: same chromosome whichever worker (or the
+    # calling process) builds it, and the global random state is untouched
+    chromosome.initialize_with_csp(backtracking, random.Random(seed))
+    chromosome.calculate_fitness()
+    return chromosome
+
+
+def _metrics_one(columns) -> Dict[str, int]:
+    """NumPy constraint metrics of one gene column view (runs in a worker process)"""
+    global _worker_template
+    if _worker_template is None:
+        _worker_template = OptimizedTimetableChromosome.from_context(_worker_context)
+    return _worker_template._vectorized_metrics(*columns, early_exit=True)
+
+
+def _tabu_one(job):
+    """
+    Tabu search on one packed chromosome (runs in a worker process).
+    Returns the (day, period) columns, or None if nothing moved.
+    """
+    seed, pack, theory, movable, blocked, fitness, max_iterations, tabu_size = job
+    seed_kernel_rng(seed)  # same result whichever worker runs the job
+    context = _worker_context
+    moves = tabu_search(pack, theory, movable, blocked, fitness, context.afternoon_mask,
+                        WEIGHT_VECTOR, context.days_per_week, context.periods_per_day,
+                        max_iterations, tabu_size)
+    return pack[:, [COL_DAY, COL_PERIOD]] if moves else None
+
+
+def seed_population(context: ScheduleContext, population_size: int,
+                    rng: np.random.Generator = None,
+                    pool: Pool = None) -> List[OptimizedTimetableChromosome]:
+    """
+    Initialize the population with CSP guidance. Each chromosome is
+    independent, so they are built in parallel across the pool workers.
+    The first tenth place their theory hours by backtracking search; the
+    rest keep the cheaper greedy pass, and its variety.
+    """
+    rng = rng or np.random.default_rng()
+    seeds = rng.integers(0, 2**32, population_size).tolist()
+    num_backtracking = max(1, population_size // 10)
+    jobs = [(seed, i < num_backtracking) for i, seed in enumerate(seeds)]
+
+    if pool is not None:
+        chunksize = max(1, population_size // (cpu_count() * 4))
+        return _collect_seeded(pool.imap(_init_one, jobs, chunksize=chunksize),
+                               population_size, context)
+
+    _init_worker(context)
+    return _collect_seeded(map(_init_one, jobs), population_size, context)
+
+
+def _collect_seeded(chromosomes, population_size: int,
+                    context: ScheduleContext) -> List[OptimizedTimetableChromosome]:
+    """
+    Gather seeded chromosomes, reporting progress every 20. Chromosomes
+    pickled back from workers arrive without the shared context, so it is
+    reattached here.
+    """
+    population = []
+    for i, chromosome in enumerate(chromosomes):
+        chromosome.attach_context(context)
+        population.append(chromosome)
+        if (i + 1) % 20 == 0:
+            avg_fitness = np.mean([p.fitness for p in population])
+            print(f"  Generated {i+1}/{population_size} | Avg Fitness: {avg_fitness:.1f}")
+    return population
+
+
+def evaluate_population(chromosomes: List[OptimizedTimetableChromosome], pool: Pool = None):
+    """
+    Recompute the fitness of every chromosome. With Numba the gene
+    columns of all chromosomes are concatenated and scored by a single
+    compiled kernel call instead of one call per chromosome. Without it,
+    the per-chromosome NumPy metrics are spread over the pool workers.
+    """
+    if not chromosomes:
+        return
+
+    if not NUMBA_AVAILABLE and pool is None:
+        for chromosome in chromosomes:
+            chromosome.calculate_fitness()
+        return
+
+    columns = [c._build_arrays() for c in chromosomes]
+    if not NUMBA_AVAILABLE:
+        chunksize = max(1, len(chromosomes) // (cpu_count() * 4))
+        for chromosome, metrics in zip(chromosomes, pool.map(_metrics_one, columns, chunksize)):
+            chromosome.set_fitness_from_metrics(metrics)
+        return
+
+    offsets = np.zeros(len(chromosomes) + 1, dtype=np.int64)
+    np.cumsum([len(cols[0]) for cols in columns], out=offsets[1:])
+    stacked = [np.concatenate([cols[k] for cols in columns]) for k in range(9)]
+
+    template = chromosomes[0]
+    values = population_metrics_kernel(offsets, *stacked, template.afternoon_mask,
+                                        template.days_per_week, template.periods_per_day,
+                                        WEIGHT_VECTOR, True)
+    for chromosome, row in zip(chromosomes, values.tolist()):
+        chromosome.set_fitness_from_metrics(dict(zip(METRIC_KEYS, row)))
+
+
+def local_search_population(chromosomes: List[OptimizedTimetableChromosome],
+                            max_iterations: int, rng: np.random.Generator,
+                            pool: Pool = None, tabu_size: int = 20):
+    """
+    tabu_local_search on several chromosomes at once, one pool task each
+    (only the packed arrays travel), then refresh their fitness
+    """
+    jobs, searched = [], []
+    for chromosome, seed in zip(chromosomes, rng.integers(0, 2**32, len(chromosomes)).tolist()):
+        # Exact raw fitness (no early exit): deltas are accumulated onto it
+        chromosome.set_fitness_from_metrics(chromosome._compute_all_metrics())
+        if len(chromosome.genes) < 2:
+            continue
+        pack, theory, movable = chromosome._tabu_inputs()
+        jobs.append((seed, pack, theory, movable, chromosome._master_blocked(pack),
+                     chromosome.raw_fitness, max_iterations, tabu_size))
+        searched.append(chromosome)
+
+    results = pool.map(_tabu_one, jobs) if pool is not None else map(_tabu_one, jobs)
+    for chromosome, job, slots in zip(searched, jobs, results):
+        if slots is not None:
+            chromosome._unpack_slots(slots, job[3])
+
+    for chromosome in chromosomes:
+        chromosome.calculate_fitness()
+
+
+# ===========================
+# ISLAND-MODEL EVOLUTION
+# ===========================
+
+# Sort key for chromosome lists, a C-level getter instead of a lambda
+_fitness = attrgetter('fitness')
+
+
+@dataclass(slots=True)
+class IslandSettings:
+    """GA parameters shared by every island of a run"""
+    generations: int
+    crossover_rate: float
+    mutation_rate_start: float
+    mutation_rate_end: float
+    elite_ratio: float
+    kernel_threads: int  # per island worker: the cores left idle by the other islands
+
+
+def _evolve_island(job):
+    """
+    Evolve one island for one migration epoch (runs in a worker process).
+    elite_search: how many of the island's best get a tabu search each
+    generation. Returns the island population (best first), its
+    stagnation counter and the number of diversity injections made.
+    """
+    (seed, population, stagnation, first_generation, num_generations,
+     elite_search, settings) = job
+    rng = np.random.default_rng(seed)
+    seed_kernel_rng(int(rng.integers(0, 2**32)))  # same result whichever worker runs the island
+    set_kernel_threads(settings.kernel_threads)
+    for chromosome in population:
+        chromosome.attach_context(_worker_context)
+    
+    island_size = len(population)
+    elite_count = int(island_size * settings.elite_ratio)
+    # Crossover units, so a single-section run still recombines
+    columns = [(section_id, day) for section_id in population[0].gene_section_ids
+               for day in range(population[0].days_per_week)]
+    fitness_arr = np.array([p.fitness for p in population], dtype=np.float32)
+    best_fitness = float(fitness_arr.max())
+    injections = 0
+    
+    for generation in range(first_generation, first_generation + num_generations):
+        # Adaptive mutation rate
+        progress = generation / settings.generations
+        mutation_rate = (settings.mutation_rate_start * (1 - progress)
+                         + settings.mutation_rate_end * progress)
+        
+        # Sort population (stable, best first) from the fitness array
+        order = np.argsort(-fitness_arr, kind='stable')
+        population = [population[i] for i in order]
+        fitness_arr = fitness_arr[order]
+        
+        if fitness_arr[0] > best_fitness:
+            best_fitness = float(fitness_arr[0])
+            stagnation = 0
+        else:
+            stagnation += 1
+        
+        if best_fitness >= 1000:
+            break
+        
+        # Diversity injection if stagnant
+        if stagnation > 50:
+            # Heavily mutated copies of the elite keep its evolved structure
+            # and are far cheaper than re-running the CSP initialization
+            elite_template = population[0]
+            injected = []
+            num_swaps = rng.integers(15, 26, island_size // 4).tolist()
+            for i in range(island_size // 4):
+                new_chromo = elite_template.clone()
+                new_chromo.swap_theory_slots(num_swaps[i], rng)
+                population[-i-1] = new_chromo
+                injected.append(new_chromo)
+            evaluate_population(injected)
+            for i, new_chromo in enumerate(injected):
+                fitness_arr[-i-1] = new_chromo.fitness
+            stagnation = 0
+            injections += 1
+        
+        # Elitism
+        next_pop = population[:elite_count]
+        
+        # Apply tabu search on the island's best
+        elites = next_pop[:elite_search]
+        local_search_population(elites, 30, rng)
+        fitness_arr[:len(elites)] = [elite.fitness for elite in elites]
+        
+        # Pre-sample this generation's random numbers in a few batched calls
+        num_pairs = (island_size - elite_count + 1) // 2
+        tourn_idx = rng.integers(0, island_size, (num_pairs * 2, 3))
+        # Every tournament of the generation resolved in one indexing pass
+        winners = tourn_idx[np.arange(num_pairs * 2), fitness_arr[tourn_idx].argmax(axis=1)]
+        cross_rolls = rng.random(num_pairs)
+        column_rolls = rng.random((num_pairs, len(columns))) < 0.5
+        mut_rolls = rng.random(num_pairs * 2)
+        
+        # Generate offspring; changed children are scored in one batch
+        changed_children = []
+        for k in range(num_pairs):
+            # Tournament selection
+            p1 = population[winners[2 * k]]
+            p2 = population[winners[2 * k + 1]]
+            
+            # Uniform crossover over (section, day) columns of theory hours
+            swapped = {columns[i] for i in np.flatnonzero(column_rolls[k])}
+            crossed = (cross_rolls[k] < settings.crossover_rate
+                       and 0 < len(swapped) < len(columns))
+            if crossed:
+                c1 = p1.column_crossover(p2, swapped)
+                c2 = p2.column_crossover(p1, swapped)
+            else:
+                # Unchanged children just reference their parents; they are
+                # only copied (copy-on-write) if mutation fires below
+                c1, c2 = p1, p2
+            
+            # Mutation
+            children = []
+            for j, child in enumerate([c1, c2]):
+                changed = crossed
+                n = len(child.genes)
+                if mut_rolls[2 * k + j] < mutation_rate and n >= 2:
+                    if not changed:
+                        child = child.clone()
+                    # Conflict-guided relocation instead of a blind gene swap
+                    changed = child.guided_mutation(rng) or changed
                 
-                if gene.day == day and gene.period == period:
-                    # Check conflicts
-                    if gene.faculty_id == faculty_id:
-                        return False  # Faculty busy
-                    if gene.section_id == section_id:
-                        return False  # Section busy
-                    if gene.is_theory and gene.room_id == room_id:
-                        return False  # Room busy (for theory)
-                    if not gene.is_theory and gene.room_id == room_id:
-                        return False  # Lab room busy
+                # Fitness of an untouched child is already known
+                if changed:
+                    changed_children.append(child)
+                children.append(child)
             
-            # Check against master schedule
-            for slot in self.master_schedule:
-                if slot['day'] == day and slot['period'] == period:
-                    if slot['faculty_id'] == faculty_id:
-                        return False
-                    if slot['section_id'] == section_id:
-                        return False
-                    if slot['room_id'] == room_id:
-                        return False
+            next_pop.extend(children)
         
-        return True  # Slot is available!
+        population = next_pop[:island_size]
+        evaluate_population(changed_children)
+        fitness_arr = np.array([p.fitness for p in population], dtype=np.float32)
+    
+    order = np.argsort(-fitness_arr, kind='stable')
+    return [population[i] for i in order], stagnation, injections
+
+
+def migrate_ring(islands: List[List[OptimizedTimetableChromosome]], num_migrants: int):
+    """
+    Ring migration: copies of each island's best `num_migrants` replace
+    the worst of the next island, which is then re-sorted best first
+    """
+    migrants = [island[:num_migrants] for island in islands]
+    for i, island in enumerate(islands):
+        # Survivors and migrants are both best first: merge, don't re-sort
+        island[:] = heapq.merge(island[:-num_migrants], [m.clone() for m in migrants[i - 1]],
+                                key=_fitness, reverse=True)
+
 
 # ===========================
 # OPTIMIZED GENETIC ALGORITHM
 # ===========================
 
 def generate_semester_timetable(subjects_data, faculties_data, sections_data,
-                               lab_rooms_data, master_schedule_data):
-    """Optimized GA with Hybrid CSP + Local Search + Tabu"""
+                               lab_rooms_data, master_schedule_data, seed: int = None):
+    """
+    Optimized GA with Hybrid CSP + Local Search + Tabu
+    seed: makes a run reproducible; every random draw derives from it
+    """
     
     # Adaptive parameters
     population_size = 120
@@ -1040,6 +1928,15 @@ def generate_semester_timetable(subjects_data, faculties_data, sections_data,
     mutation_rate_start = 0.25
     mutation_rate_end = 0.05
     elite_ratio = 0.15
+    convergence_window = 75
+    convergence_epsilon = 5.0
+    
+    # Island model: sub-populations evolve independently (one pool task
+    # each) and pass their best to the next island in a ring every epoch.
+    # A fixed island count keeps seeded runs identical on any machine.
+    num_islands = 4
+    migration_interval = 20
+    num_migrants = 2
     
     print("\n" + "="*70)
     print("OPTIMIZED VTU TIMETABLE GENERATION v5.1")
@@ -1059,107 +1956,87 @@ def generate_semester_timetable(subjects_data, faculties_data, sections_data,
     print(f"  Lab Rooms: {len(lab_rooms)}")
     
     start_time = time.time()
+    # One generator for the whole run; draws are batched per generation
+    rng = np.random.default_rng(seed)
+    seed_kernel_rng(int(rng.integers(0, 2**32)))
     
     # Initialize population with CSP
     print("\n🎲 Initializing population with CSP guidance...")
-    population = []
-    
-    for i in range(population_size):
-        chromosome = OptimizedTimetableChromosome(
-            subjects, faculties, sections, lab_rooms, master_schedule_data
-        )
-        chromosome.initialize_with_csp()
-        chromosome.calculate_fitness()
-        population.append(chromosome)
-        
-        if (i + 1) % 20 == 0:
-            avg_fitness = sum(p.fitness for p in population) / len(population)
-            print(f"  Generated {i+1}/{population_size} | Avg Fitness: {avg_fitness:.1f}")
-    
-    best_ever = max(population, key=lambda x: x.fitness)
-    stagnation_counter = 0
-    
-    print("\n🧬 Evolution in progress...")
-    
-    for generation in range(generations):
-        # Adaptive mutation rate
-        progress = generation / generations
-        mutation_rate = mutation_rate_start * (1 - progress) + mutation_rate_end * progress
-        
-        # Sort population
-        population.sort(key=lambda x: x.fitness, reverse=True)
-        
-        # Track best
-        if population[0].fitness > best_ever.fitness:
-            best_ever = copy.deepcopy(population[0])
-            stagnation_counter = 0
-        else:
-            stagnation_counter += 1
-        
-        # Progress report
-        if generation % 50 == 0:
-            avg_fit = sum(p.fitness for p in population) / len(population)
-            print(f"  Gen {generation:3d} | Best: {best_ever.fitness:6.1f} | "
+    context = ScheduleContext(subjects, faculties, sections, lab_rooms, master_schedule_data)
+    settings = IslandSettings(generations, crossover_rate, mutation_rate_start, mutation_rate_end,
+                              elite_ratio, kernel_threads=max(1, cpu_count() // num_islands))
+    # The 5 elites a generation gets tabu-searched, spread over the islands
+    elite_search = [5 // num_islands + (i < 5 % num_islands) for i in range(num_islands)]
+    # One worker per island: the most tasks run at once after seeding
+    with worker_pool(context, num_islands) as pool:
+        population = seed_population(context, population_size, rng=rng, pool=pool)
+        
+        # Dealt round-robin from the fitness ranking, so every island
+        # starts with a share of the best seeds
+        ranked = sorted(population, key=_fitness, reverse=True)
+        islands = [ranked[i::num_islands] for i in range(num_islands)]
+        stagnation = [0] * num_islands
+        best_ever = ranked[0].clone()
+        
+        # (best, avg) fitness of the last epochs; one more entry than the
+        # window spans, so the oldest is at least `convergence_window` back
+        history = deque(maxlen=-(-convergence_window // migration_interval) + 1)
+        final_injection_done = False
+        
+        print(f"\n🧬 Evolution in progress ({num_islands} islands)...")
+        
+        for generation in range(0, generations, migration_interval):
+            # Every island evolves independently for one epoch
+            num_generations = min(migration_interval, generations - generation)
+            seeds = rng.integers(0, 2**32, num_islands).tolist()
+            jobs = [(seeds[i], islands[i], stagnation[i], generation, num_generations,
+                     elite_search[i], settings)
+                    for i in range(num_islands)]
+            results = pool.map(_evolve_island, jobs) if pool is not None else map(_evolve_island, jobs)
+            
+            islands, stagnation, injections = [], [], 0
+            for island, island_stagnation, island_injections in results:
+                for chromosome in island:
+                    chromosome.attach_context(context)
+                islands.append(island)
+                stagnation.append(island_stagnation)
+                injections += island_injections
+            if injections:
+                print(f"  💉 Injected diversity {injections}x")
+            
+            # Track best
+            champion = max((island[0] for island in islands), key=_fitness)
+            if champion.fitness > best_ever.fitness:
+                best_ever = champion.clone()
+            
+            # Progress report
+            avg_fit = np.mean([c.fitness for island in islands for c in island])
+            progress = (generation + num_generations) / generations
+            mutation_rate = mutation_rate_start * (1 - progress) + mutation_rate_end * progress
+            print(f"  Gen {generation + num_generations:3d} | Best: {best_ever.fitness:6.1f} | "
                   f"Avg: {avg_fit:6.1f} | Mutation: {mutation_rate:.3f}")
-        
-        # Early stopping
-        if best_ever.fitness >= 1000:
-            print(f"\n✨ Perfect solution found at generation {generation}!")
-            break
-        
-        # Diversity injection if stagnant
-        if stagnation_counter > 50:
-            print("  💉 Injecting diversity...")
-            for i in range(population_size // 4):
-                new_chromo = OptimizedTimetableChromosome(
-                    subjects, faculties, sections, lab_rooms, master_schedule_data
-                )
-                new_chromo.initialize_with_csp()
-                new_chromo.calculate_fitness()
-                population[-i-1] = new_chromo
-            stagnation_counter = 0
-        
-        # Elitism
-        elite_count = int(population_size * elite_ratio)
-        next_pop = population[:elite_count]
-        
-        # Apply tabu search on elite
-        for elite in next_pop[:5]:
-            elite.tabu_local_search(max_iterations=30)
-            elite.calculate_fitness()
-        
-        # Generate offspring
-        while len(next_pop) < population_size:
-            # Tournament selection
-            p1 = max(random.sample(population, 3), key=lambda x: x.fitness)
-            p2 = max(random.sample(population, 3), key=lambda x: x.fitness)
             
-            # Crossover
-            if random.random() < crossover_rate:
-                c1 = copy.deepcopy(p1)
-                c2 = copy.deepcopy(p2)
-                
-                if len(c1.genes) > 1 and len(c2.genes) > 1:
-                    pt = random.randint(1, min(len(c1.genes), len(c2.genes)) - 1)
-                    c1.genes, c2.genes = c1.genes[:pt] + c2.genes[pt:], c2.genes[:pt] + c1.genes[pt:]
-                    
-                    c1.constraint_checker.rebuild_from_genes(c1.genes)
-                    c2.constraint_checker.rebuild_from_genes(c2.genes)
-            else:
-                c1, c2 = copy.deepcopy(p1), copy.deepcopy(p2)
+            # Early stopping
+            if best_ever.fitness >= 1000:
+                print(f"\n✨ Perfect solution found by generation {generation + num_generations}!")
+                break
             
-            # Mutation
-            for child in [c1, c2]:
-                if random.random() < mutation_rate and len(child.genes) >= 2:
-                    idx1, idx2 = random.sample(range(len(child.genes)), 2)
-                    child.genes[idx1], child.genes[idx2] = child.genes[idx2], child.genes[idx1]
-                    child.constraint_checker.rebuild_from_genes(child.genes)
-                
-                child.calculate_fitness()
+            # Convergence: best flat for the whole window and the population
+            # has collapsed onto it. Try one last diversity injection first.
+            history.append((best_ever.fitness, float(avg_fit)))
+            if (len(history) == history.maxlen
+                    and history[0][0] == best_ever.fitness
+                    and best_ever.fitness - history[-1][1] < convergence_epsilon):
+                if final_injection_done:
+                    print(f"\n📉 Converged at generation {generation + num_generations} "
+                          f"(no improvement in {convergence_window} generations)")
+                    break
+                final_injection_done = True
+                history.clear()
+                stagnation = [max(s, 50) for s in stagnation]
             
-            next_pop.extend([c1, c2])
-        
-        population = next_pop[:population_size]
+            if num_islands > 1:
+                migrate_ring(islands, num_migrants)
     
     # Repair broken lab continuity
     repairs_made = best_ever.repair_lab_continuity_post_generation()
@@ -1173,6 +2050,9 @@ def generate_semester_timetable(subjects_data, faculties_data, sections_data,
     # Optional: One more round of local search after repairs
     if best_ever.fitness < 900:
         print("\n🔍 Applying final local search...")
+        # Serial islands reseed the kernel RNG in this process; reseed from
+        # the run's generator so the result does not depend on the pool
+        seed_kernel_rng(int(rng.integers(0, 2**32)))
         best_ever.tabu_local_search(max_iterations=50)
         best_ever.calculate_fitness()
         print(f"   Final fitness: {best_ever.fitness:.2f}")
@@ -1190,12 +2070,15 @@ def generate_semester_timetable(subjects_data, faculties_data, sections_data,
     print("\n📊 Constraint Violation Analysis:")
     print("-" * 70)
     
+    # All metrics from one fused pass
+    metrics = best_ever._compute_all_metrics()
+
     # Hard constraints
-    faculty_conflicts = best_ever._count_conflicts_fast('faculty')
-    section_conflicts = best_ever._count_conflicts_fast('section')
-    room_conflicts = best_ever._count_conflicts_fast('room')
-    lab_continuity = best_ever._check_lab_continuity()
-    project_continuity = best_ever._check_project_continuity()
+    faculty_conflicts = metrics['faculty_conflicts']
+    section_conflicts = metrics['section_conflicts']
+    room_conflicts = metrics['room_conflicts']
+    lab_continuity = metrics['lab_continuity']
+    project_continuity = metrics['project_continuity']
     
     if lab_continuity > 0:
         print(f"    Lab Continuity Issues:  {lab_continuity:3d} ❌")
@@ -1236,11 +2119,11 @@ def generate_semester_timetable(subjects_data, faculties_data, sections_data,
                             lab_continuity + project_continuity)
     
     # Soft constraints
-    gaps = best_ever._check_gaps()
-    theory_distribution = best_ever._check_theory_distribution()
-    theory_afternoon = best_ever._penalize_theory_afternoon()
-    sparse_days = best_ever._penalize_sparse_days()
-    saturday_labs = best_ever._penalize_saturday_labs()
+    gaps = metrics['gaps']
+    theory_distribution = metrics['theory_distribution']
+    theory_afternoon = metrics['theory_afternoon']
+    sparse_days = metrics['sparse_days']
+    saturday_labs = metrics['saturday_labs']
 
     print(f"\n  Soft Constraints:")
     print(f"    Schedule Gaps:          {gaps:3d} {'✅' if gaps < 10 else '⚠️'}")
@@ -1298,9 +2181,9 @@ def generate_semester_timetable(subjects_data, faculties_data, sections_data,
         
         # Ask for regeneration
         print("\n🔄 Recommendation: Regenerate timetable")
-        return [gene.__dict__ for gene in best_ever.genes] # Return None to signal regeneration needed
+        return [asdict(gene) for gene in best_ever.genes] # Return None to signal regeneration needed
     
-    return [gene.__dict__ for gene in best_ever.genes]
+    return [asdict(gene) for gene in best_ever.genes]
 
 def generate_timetable_with_retry(subjects_data, faculties_data, sections_data,
                                   lab_rooms_data, master_schedule_data,
@@ -0,0 +1,579 @@
+"""
+Numeric kernels of the timetable scheduler, on packed int arrays:
+booking counts and swap/move deltas for local search, and the
+constraint-metric (fitness) kernels. Compiled with Numba when it is
+installed; otherwise the same functions run as plain Python/NumPy.
+"""
+
+import numpy as np
+
+try:
+    import numba
+    from numba import get_num_threads, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; kernels then run as plain Python
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    def get_num_threads():
+        return 1
+
+
+def set_kernel_threads(num_threads: int):
+    """Cap the threads the parallel kernels use in this process (no-op without Numba)"""
+    if NUMBA_AVAILABLE:
+        numba.set_num_threads(max(1, min(num_threads, numba.config.NUMBA_NUM_THREADS)))
+
+
+# ===========================
+# PACKED GENE KERNELS (Numba-compiled when available)
+# ===========================
+
+# Column layout of the packed genes of OptimizedTimetableChromosome._tabu_inputs()
+COL_SUBJECT, COL_SECTION, COL_BATCH, COL_DAY, COL_PERIOD, COL_FACULTY, COL_ROOM = range(7)
+
+# Positions in the metric / weight vectors (scheduler.METRIC_KEYS order)
+(W_FACULTY, W_SECTION, W_ROOM, W_LAB, W_PROJECT, W_GAPS, W_DISTRIBUTION, W_AFTERNOON,
+ W_SPARSE, W_SATURDAY) = range(10)
+
+
+@njit(cache=True)
+def build_bookings(pack, theory, num_days, num_periods):
+    """
+    Dense booking counts of the packed genes:
+    (faculty, day, period), (section, day, period), theory-only
+    (room, day, period) and theory-only (subject, section, day)
+    """
+    faculty_busy = np.zeros((pack[:, COL_FACULTY].max() + 1, num_days, num_periods), np.int32)
+    section_busy = np.zeros((pack[:, COL_SECTION].max() + 1, num_days, num_periods), np.int32)
+    room_busy = np.zeros((pack[:, COL_ROOM].max() + 1, num_days, num_periods), np.int32)
+    theory_days = np.zeros((pack[:, COL_SUBJECT].max() + 1, pack[:, COL_SECTION].max() + 1,
+                            num_days), np.int32)
+    busy = (faculty_busy, section_busy, room_busy, theory_days)
+    for g in range(pack.shape[0]):
+        book(pack, theory, busy, g, 1)
+    return busy
+
+
+@njit(cache=True)
+def book(pack, theory, busy, g, count):
+    """Add (count=1) or remove (count=-1) gene g at its current slot"""
+    faculty_busy, section_busy, room_busy, theory_days = busy
+    day, period = pack[g, COL_DAY], pack[g, COL_PERIOD]
+    faculty_busy[pack[g, COL_FACULTY], day, period] += count
+    section_busy[pack[g, COL_SECTION], day, period] += count
+    if theory[g]:
+        room_busy[pack[g, COL_ROOM], day, period] += count
+        theory_days[pack[g, COL_SUBJECT], pack[g, COL_SECTION], day] += count
+
+
+@njit(cache=True)
+def swap_slots(pack, theory, busy, i, j):
+    """Swap the (day, period) of genes i and j, keeping the bookings in step"""
+    book(pack, theory, busy, i, -1)
+    book(pack, theory, busy, j, -1)
+    for col in (COL_DAY, COL_PERIOD):
+        pack[i, col], pack[j, col] = pack[j, col], pack[i, col]
+    book(pack, theory, busy, i, 1)
+    book(pack, theory, busy, j, 1)
+
+
+@njit(cache=True)
+def conflict_delta(resource_busy, ri, rj, di, pi, dj, pj):
+    """Change in conflicts on one resource if bookings ri@(di, pi) and rj@(dj, pj) swap slots"""
+    if ri == rj:
+        return 0
+
+    delta = 0
+    # ri leaves slot i and joins slot j
+    if resource_busy[ri, di, pi] >= 2:
+        delta -= 1
+    if resource_busy[ri, dj, pj] >= 1:
+        delta += 1
+    # rj leaves slot j and joins slot i
+    if resource_busy[rj, dj, pj] >= 2:
+        delta -= 1
+    if resource_busy[rj, di, pi] >= 1:
+        delta += 1
+    return delta
+
+
+@njit(cache=True)
+def section_day_penalty(section_busy, weights, section, day):
+    """Weighted gap + sparse-day penalty of one (section, day)"""
+    count, lo, hi = 0, -1, -1
+    for period in range(section_busy.shape[2]):
+        booked = section_busy[section, day, period]
+        if booked:
+            count += booked
+            if lo < 0:
+                lo = period
+            hi = period
+
+    if count == 0:
+        return 0
+    penalty = (hi - lo + 1 - count) * 2 * weights[W_GAPS]
+    if count <= 2:
+        penalty += (3 - count) * weights[W_SPARSE]
+    return penalty
+
+
+@njit(cache=True)
+def day_groups_penalty(busy, weights, keys):
+    """Weighted day penalties of the distinct (subject, section, day) groups in keys"""
+    section_busy, theory_days = busy[1], busy[3]
+    penalty = 0
+    for k in range(keys.shape[0]):
+        seen_section_day = False
+        seen_theory_day = False
+        for m in range(k):
+            if keys[m, 1] == keys[k, 1] and keys[m, 2] == keys[k, 2]:
+                seen_section_day = True
+                if keys[m, 0] == keys[k, 0]:
+                    seen_theory_day = True
+        subject, section, day = keys[k, 0], keys[k, 1], keys[k, 2]
+        if not seen_section_day:
+            penalty += section_day_penalty(section_busy, weights, section, day)
+        if not seen_theory_day:
+            penalty += max(theory_days[subject, section, day] - 2, 0) * weights[W_DISTRIBUTION]
+    return penalty
+
+
+@njit(cache=True)
+def swap_hard_delta(pack, busy, i, j):
+    """Change in faculty + section + room conflicts if theory genes i and j swap slots"""
+    di, pi = pack[i, COL_DAY], pack[i, COL_PERIOD]
+    dj, pj = pack[j, COL_DAY], pack[j, COL_PERIOD]
+    if di == dj and pi == pj:
+        return 0
+    faculty_busy, section_busy, room_busy, _ = busy
+    return (conflict_delta(faculty_busy, pack[i, COL_FACULTY], pack[j, COL_FACULTY], di, pi, dj, pj)
+            + conflict_delta(section_busy, pack[i, COL_SECTION], pack[j, COL_SECTION],
+                             di, pi, dj, pj)
+            + conflict_delta(room_busy, pack[i, COL_ROOM], pack[j, COL_ROOM], di, pi, dj, pj))
+
+
+@njit(cache=True)
+def master_busy(blocked, g, day, period, num_periods):
+    """
+    True if the master schedule holds gene g's faculty, section or room
+    at (day, period). blocked: per gene, a week slot bitmask in the
+    constraint checker's bit layout (day * periods + period).
+    """
+    return (blocked[g] >> (day * num_periods + period)) & 1 != 0
+
+
+@njit(cache=True)
+def slot_swap_delta(pack, theory, busy, weights, i, j):
+    """
+    Change in fitness if theory genes i and j swap their (day, period).
+    Only the constraint terms those two genes touch are evaluated, each
+    read from the booking counts; lab, project, Saturday and afternoon
+    totals cannot change under a swap. weights: METRIC_KEYS order.
+    """
+    di, pi = pack[i, COL_DAY], pack[i, COL_PERIOD]
+    dj, pj = pack[j, COL_DAY], pack[j, COL_PERIOD]
+    if di == dj and pi == pj:
+        return 0
+
+    faculty_busy, section_busy, room_busy, _ = busy
+    penalty = 0
+    penalty += conflict_delta(faculty_busy, pack[i, COL_FACULTY], pack[j, COL_FACULTY],
+                               di, pi, dj, pj) * weights[W_FACULTY]
+    penalty += conflict_delta(section_busy, pack[i, COL_SECTION], pack[j, COL_SECTION],
+                               di, pi, dj, pj) * weights[W_SECTION]
+    penalty += conflict_delta(room_busy, pack[i, COL_ROOM], pack[j, COL_ROOM],
+                               di, pi, dj, pj) * weights[W_ROOM]
+
+    # (section, day) and (subject, section, day) groups touched by the swap
+    keys = np.empty((4, 3), np.int64)
+    for k in range(4):
+        g = i if k < 2 else j
+        keys[k, 0] = pack[g, COL_SUBJECT]
+        keys[k, 1] = pack[g, COL_SECTION]
+        keys[k, 2] = di if k % 2 == 0 else dj
+
+    penalty -= day_groups_penalty(busy, weights, keys)
+    swap_slots(pack, theory, busy, i, j)
+    penalty += day_groups_penalty(busy, weights, keys)
+    swap_slots(pack, theory, busy, i, j)
+
+    return -penalty
+
+
+@njit(cache=True)
+def move_conflict_delta(resource_busy, r, d0, p0, d1, p1):
+    """Change in conflicts on one resource if booking r moves from (d0, p0) to (d1, p1)"""
+    delta = 0
+    if resource_busy[r, d0, p0] >= 2:
+        delta -= 1
+    if resource_busy[r, d1, p1] >= 1:
+        delta += 1
+    return delta
+
+
+@njit(cache=True)
+def move_hard_delta(pack, busy, i, day, period):
+    """Change in faculty + section + room conflicts if theory gene i moves to (day, period)"""
+    d0, p0 = pack[i, COL_DAY], pack[i, COL_PERIOD]
+    if d0 == day and p0 == period:
+        return 0
+    faculty_busy, section_busy, room_busy, _ = busy
+    return (move_conflict_delta(faculty_busy, pack[i, COL_FACULTY], d0, p0, day, period)
+            + move_conflict_delta(section_busy, pack[i, COL_SECTION], d0, p0, day, period)
+            + move_conflict_delta(room_busy, pack[i, COL_ROOM], d0, p0, day, period))
+
+
+@njit(cache=True)
+def move_slot(pack, theory, busy, i, day, period):
+    """Move gene i to (day, period), keeping the bookings in step"""
+    book(pack, theory, busy, i, -1)
+    pack[i, COL_DAY], pack[i, COL_PERIOD] = day, period
+    book(pack, theory, busy, i, 1)
+
+
+@njit(cache=True)
+def slot_move_delta(pack, theory, busy, afternoon_mask, weights, i, day, period):
+    """
+    Change in fitness if non-project theory gene i moves to (day, period).
+    Like slot_swap_delta, but the afternoon total can change as well.
+    """
+    d0, p0 = pack[i, COL_DAY], pack[i, COL_PERIOD]
+    if d0 == day and p0 == period:
+        return 0
+
+    faculty_busy, section_busy, room_busy, _ = busy
+    penalty = 0
+    penalty += (move_conflict_delta(faculty_busy, pack[i, COL_FACULTY], d0, p0, day, period)
+                * weights[W_FACULTY])
+    penalty += (move_conflict_delta(section_busy, pack[i, COL_SECTION], d0, p0, day, period)
+                * weights[W_SECTION])
+    penalty += (move_conflict_delta(room_busy, pack[i, COL_ROOM], d0, p0, day, period)
+                * weights[W_ROOM])
+    # Afternoon theory counts triple
+    penalty += (int(afternoon_mask[period]) - int(afternoon_mask[p0])) * 3 * weights[W_AFTERNOON]
+
+    keys = np.empty((2, 3), np.int64)
+    for k in range(2):
+        keys[k, 0] = pack[i, COL_SUBJECT]
+        keys[k, 1] = pack[i, COL_SECTION]
+        keys[k, 2] = d0 if k == 0 else day
+
+    penalty -= day_groups_penalty(busy, weights, keys)
+    move_slot(pack, theory, busy, i, day, period)
+    penalty += day_groups_penalty(busy, weights, keys)
+    move_slot(pack, theory, busy, i, d0, p0)
+
+    return -penalty
+
+
+@njit(cache=True)
+def seed_kernel_rng(seed):
+    """Seed the random state used inside compiled kernels (separate from NumPy's)"""
+    np.random.seed(seed)
+
+
+@njit(cache=True)
+def tabu_step(pack, theory, busy, blocked, afternoon_mask, weights, movable, tabu,
+              num_candidates):
+    """
+    Best improving non-tabu move among random candidates: (i, j, delta).
+    Half the candidates swap the slots of genes i and j; the others move
+    gene i to any (day, period), encoded as j = -1 - (day * periods + period).
+    A candidate that adds a faculty, section or room conflict (a move
+    into a slot its resources already hold, or a swap that double-books
+    one) is never taken, whatever soft credit it would earn; nor is one
+    that lands a gene on a slot the master schedule holds for it (see
+    master_busy).
+    """
+    best_i, best_j, best_delta = -1, -1, 0
+    n = movable.size
+    if n == 0:
+        return best_i, best_j, best_delta
+    num_periods = busy[0].shape[2]
+    num_slots = busy[0].shape[1] * num_periods
+
+    for _ in range(num_candidates):
+        a = movable[np.random.randint(0, n)]
+        if np.random.random() < 0.5:
+            b = movable[np.random.randint(0, n)]
+            if a == b:
+                continue
+            i, j = min(a, b), max(a, b)
+        else:
+            i, j = a, -1 - np.random.randint(0, num_slots)
+
+        is_tabu = False
+        for t in range(tabu.shape[0]):
+            if tabu[t, 0] == i and tabu[t, 1] == j:
+                is_tabu = True
+                break
+        if is_tabu:
+            continue
+
+        # The cheap hard-conflict count first: a candidate that raises it
+        # is dropped before its soft penalties are rescored
+        if j >= 0:
+            di, pi = pack[i, COL_DAY], pack[i, COL_PERIOD]
+            dj, pj = pack[j, COL_DAY], pack[j, COL_PERIOD]
+            if (master_busy(blocked, i, dj, pj, num_periods)
+                    or master_busy(blocked, j, di, pi, num_periods)):
+                continue
+            if swap_hard_delta(pack, busy, i, j) > 0:
+                continue
+            delta = slot_swap_delta(pack, theory, busy, weights, i, j)
+        else:
+            day, period = divmod(-1 - j, num_periods)
+            if master_busy(blocked, i, day, period, num_periods):
+                continue
+            if move_hard_delta(pack, busy, i, day, period) > 0:
+                continue
+            delta = slot_move_delta(pack, theory, busy, afternoon_mask, weights, i, day, period)
+        if delta > best_delta:
+            best_i, best_j, best_delta = i, j, delta
+
+    return best_i, best_j, best_delta
+
+
+def tabu_search(pack, theory, movable, blocked, fitness, afternoon_mask, weights, num_days,
+                num_periods, max_iterations, tabu_size) -> int:
+    """
+    Tabu search over theory slot swaps and single-gene moves, scored by
+    their fitness deltas and applied to pack in place.
+    blocked: per gene, the master schedule slots it must not move onto
+    (see master_busy). fitness is the exact raw fitness of pack under
+    weights (METRIC_KEYS order); returns the number of moves.
+    """
+    busy = build_bookings(pack, theory, num_days, num_periods)
+    tabu = np.full((tabu_size, 2), -1, dtype=np.int64)
+    moves = 0
+
+    for iteration in range(max_iterations):
+        if fitness >= 1000:
+            break
+
+        # Find best non-tabu move among random candidates
+        idx1, idx2, delta = tabu_step(pack, theory, busy, blocked, afternoon_mask, weights,
+                                      movable, tabu, 10)
+        if idx1 < 0:
+            continue
+
+        if idx2 >= 0:
+            swap_slots(pack, theory, busy, idx1, idx2)
+        else:
+            day, period = divmod(-1 - idx2, num_periods)
+            move_slot(pack, theory, busy, idx1, day, period)
+        fitness += delta
+        tabu[moves % tabu_size] = (idx1, idx2)
+        moves += 1
+
+    return moves
+
+
+# ===========================
+# FITNESS KERNEL (Numba-compiled when available)
+# ===========================
+
+@njit(cache=True)
+def not_one_run(bits):
+    """
+    True where the set bits of a non-zero period mask do not form one
+    contiguous run (scalar or array)
+    """
+    run = bits // (bits & -bits)  # shift out trailing zeros
+    return (run & (run + 1)) != 0
+
+
+@njit(cache=True)
+def fitness_bound(metrics, weights):
+    """
+    Upper bound on raw fitness from the metrics computed so far. Valid
+    while only non-negative penalties are missing; gaps can be negative
+    so they must already be included.
+    """
+    bound = 1000
+    for k in range(metrics.size):
+        bound -= metrics[k] * weights[k]
+    return bound
+
+
+@njit(cache=True)
+def metrics_work_arrays(n_faculties, n_sections, n_rooms, n_subjects, n_batches,
+                        num_days, num_periods):
+    """
+    Zeroed scratch arrays of metrics_into, sized for the id ranges of a
+    whole GA run so one set can be reused for every chromosome
+    """
+    return (
+        np.zeros((n_faculties, num_days, num_periods), np.int32),   # faculty_busy
+        np.zeros((n_sections, num_days, num_periods), np.int32),    # section_busy
+        np.zeros((n_rooms, num_days, num_periods), np.int32),       # room_busy
+        np.zeros((n_subjects, n_sections, num_days), np.int32),     # theory_days
+        np.zeros((n_sections, num_days), np.int32),                 # project_count
+        np.zeros((n_sections, num_days), np.int64),                 # project_bits
+        # Period bitmask of each (subject, section, batch, day) lab block;
+        # -1 once a period repeats, which can never be continuous
+        np.zeros((n_subjects, n_sections, n_batches, num_days), np.int64),
+    )
+
+
+@njit(cache=True)
+def metrics_into(metrics, work, day, period, faculty, section, room, subject, batch,
+                 is_theory, is_project, afternoon_mask, weights, early_exit):
+    """
+    Fill metrics (METRIC_KEYS order, zeroed) for one gene view using the
+    scratch arrays of metrics_work_arrays. Cost follows the gene count,
+    not the array sizes: an over-booking is counted as the extra booking
+    lands, and only the cells the genes touched are reset afterwards,
+    leaving the work arrays zeroed for the next chromosome.
+    With early_exit, lab continuity and theory distribution are left at
+    0 once the weighted penalties already clamp fitness to 0.
+    """
+    faculty_busy, section_busy, room_busy, theory_days, project_count, project_bits, lab_bits = work
+    num_periods = section_busy.shape[2]
+
+    afternoon_bits = 0
+    for p in range(num_periods):
+        if afternoon_mask[p]:
+            afternoon_bits |= 1 << p
+
+    # Hard constraints: (count - 1) per over-booked (resource, day, period)
+    theory_excess = 0
+    for g in range(day.size):
+        d, p, sec, f = day[g], period[g], section[g], faculty[g]
+        if faculty_busy[f, d, p]:
+            metrics[0] += 1
+        faculty_busy[f, d, p] += 1
+        if section_busy[sec, d, p]:
+            metrics[1] += 1
+        section_busy[sec, d, p] += 1
+        if is_theory[g]:
+            r, s = room[g], subject[g]
+            if room_busy[r, d, p]:
+                metrics[2] += 1
+            room_busy[r, d, p] += 1
+            # Theory spread: more than two hours of a subject on one day
+            if theory_days[s, sec, d] >= 2:
+                theory_excess += 1
+            theory_days[s, sec, d] += 1
+            if not is_project[g] and afternoon_mask[p]:
+                metrics[7] += 3
+        else:
+            bits = lab_bits[subject[g], sec, batch[g], d]
+            lab_bits[subject[g], sec, batch[g], d] = -1 if bits & (1 << p) else bits | (1 << p)
+            if not is_project[g] and d == 5:
+                metrics[9] += 1
+        if is_project[g]:
+            project_count[sec, d] += 1
+            project_bits[sec, d] |= 1 << p
+
+    # Per-(section, day): projects, gaps and sparse days (cleared as read)
+    for sec in range(section_busy.shape[0]):
+        for d in range(section_busy.shape[1]):
+            if project_count[sec, d] and (project_count[sec, d] != 3
+                                          or project_bits[sec, d] != afternoon_bits):
+                metrics[4] += 1
+            project_count[sec, d] = 0
+            project_bits[sec, d] = 0
+
+            count, lo, hi = 0, -1, -1
+            for p in range(num_periods):
+                booked = section_busy[sec, d, p]
+                if booked:
+                    section_busy[sec, d, p] = 0
+                    count += booked
+                    if lo < 0:
+                        lo = p
+                    hi = p
+            if count:
+                metrics[5] += (hi - lo + 1 - count) * 2
+                if count <= 2:
+                    metrics[8] += 3 - count
+
+    exact = not (early_exit and fitness_bound(metrics, weights) <= 0)
+    if exact:
+        metrics[6] = theory_excess
+
+    # Reset the touched cells; lab blocks are scored once each on the way:
+    # the periods of each (subject, section, batch, day) must form one
+    # contiguous run of set bits
+    for g in range(day.size):
+        d, p = day[g], period[g]
+        faculty_busy[faculty[g], d, p] = 0
+        if is_theory[g]:
+            room_busy[room[g], d, p] = 0
+            theory_days[subject[g], section[g], d] = 0
+        else:
+            bits = lab_bits[subject[g], section[g], batch[g], d]
+            if bits:
+                if exact and (bits < 0 or not_one_run(bits)):
+                    metrics[3] += 1
+                lab_bits[subject[g], section[g], batch[g], d] = 0
+
+
+@njit(cache=True)
+def metrics_kernel(day, period, faculty, section, room, subject, batch, is_theory, is_project,
+                    afternoon_mask, num_days, num_periods, weights, early_exit):
+    """
+    Every constraint metric of a structure-of-arrays gene view in one
+    compiled pass, returned in METRIC_KEYS order. Mirrors the NumPy
+    path of OptimizedTimetableChromosome._compute_all_metrics.
+    """
+    metrics = np.zeros(10, np.int64)
+    if day.size == 0:
+        return metrics
+
+    work = metrics_work_arrays(faculty.max() + 1, section.max() + 1, room.max() + 1,
+                               subject.max() + 1, batch.max() + 1, num_days, num_periods)
+    metrics_into(metrics, work, day, period, faculty, section, room, subject, batch,
+                 is_theory, is_project, afternoon_mask, weights, early_exit)
+    return metrics
+
+
+def population_metrics_kernel(offsets, day, period, faculty, section, room, subject, batch,
+                               is_theory, is_project, afternoon_mask, num_days, num_periods,
+                               weights, early_exit):
+    """
+    Metrics of a whole population in one call. Chromosome c owns rows
+    offsets[c]:offsets[c + 1] of the concatenated gene columns. The
+    chromosomes are split into one contiguous block per kernel thread
+    (see set_kernel_threads).
+    """
+    num_blocks = max(1, min(get_num_threads(), offsets.size - 1))
+    return population_metrics_blocks(num_blocks, offsets, day, period, faculty, section, room,
+                                     subject, batch, is_theory, is_project, afternoon_mask,
+                                     num_days, num_periods, weights, early_exit)
+
+
+@njit(cache=True, parallel=True)
+def population_metrics_blocks(num_blocks, offsets, day, period, faculty, section, room, subject,
+                              batch, is_theory, is_project, afternoon_mask, num_days, num_periods,
+                              weights, early_exit):
+    """
+    population_metrics_kernel over num_blocks blocks of chromosomes run in
+    parallel. The id ranges are fixed for the call, so one set of work
+    arrays serves every chromosome of a block.
+    """
+    num_chromosomes = offsets.size - 1
+    metrics = np.zeros((num_chromosomes, 10), np.int64)
+    if day.size == 0:
+        return metrics
+
+    n_faculties, n_sections, n_rooms = faculty.max() + 1, section.max() + 1, room.max() + 1
+    n_subjects, n_batches = subject.max() + 1, batch.max() + 1
+    for b in prange(num_blocks):
+        work = metrics_work_arrays(n_faculties, n_sections, n_rooms, n_subjects, n_batches,
+                                   num_days, num_periods)
+        for c in range(b * num_chromosomes // num_blocks, (b + 1) * num_chromosomes // num_blocks):
+            lo, hi = offsets[c], offsets[c + 1]
+            metrics_into(
+                metrics[c], work, day[lo:hi], period[lo:hi], faculty[lo:hi], section[lo:hi],
+                room[lo:hi], subject[lo:hi], batch[lo:hi], is_theory[lo:hi], is_project[lo:hi],
+                afternoon_mask, weights, early_exit,
+            )
+    return metrics
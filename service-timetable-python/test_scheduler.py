@@ -0,0 +1,181 @@
+"""
+Invariants of the chromosome operators (against the master schedule)
+and of the constraint metrics.
+Run with: python -m pytest test_scheduler.py
+"""
+
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from scheduler import (
+    METRIC_KEYS, WEIGHT_VECTOR, Faculty, LabRoom, OptimizedTimetableChromosome,
+    ScheduleContext, Section, Subject,
+)
+from scheduler_kernels import metrics_kernel
+
+NUM_FACULTIES = 6
+
+
+def make_context(seed, num_sections=2, num_faculties=NUM_FACULTIES, num_labs=0):
+    """
+    Theory and project subjects (plus num_labs two-batch labs) per
+    section over a few shared faculties, with a master schedule holding
+    every faculty on days 0-1, periods 0-3
+    """
+    rnd = random.Random(seed)
+    faculty_ids = [f"F{i}" for i in range(num_faculties)]
+    subjects, sections = [], []
+    for s in range(num_sections):
+        name = "ABCDEFGH"[s]
+        sections.append(Section(id=f"5_{name}", name=name, semester="5", classroom=f"CR{s}"))
+        for k in range(5):
+            subjects.append(Subject(
+                subject_code=f"T{k}{name}", subject_name=f"Theory {k}", subject_type="PCC",
+                theory_hours=rnd.choice([3, 4]), lab_hours=0, theory_faculty=rnd.choice(faculty_ids),
+                lab_faculty="", no_of_batches=0, section=name, semester="5",
+            ))
+        for k in range(num_labs):
+            subjects.append(Subject(
+                subject_code=f"L{k}{name}", subject_name=f"Lab {k}", subject_type="PCCL",
+                theory_hours=0, lab_hours=2, theory_faculty="", lab_faculty=rnd.choice(faculty_ids),
+                no_of_batches=2, section=name, semester="5",
+            ))
+        subjects.append(Subject(
+            subject_code=f"P{name}", subject_name="Project", subject_type="PROJ",
+            theory_hours=0, lab_hours=6, theory_faculty="", lab_faculty=rnd.choice(faculty_ids),
+            no_of_batches=0, section=name, semester="5",
+        ))
+    master_schedule = [
+        {"day": day, "period": period, "faculty_id": faculty_id, "section_id": "3_Z",
+         "room_id": "CRZ", "is_theory": True}
+        for faculty_id in faculty_ids for day in (0, 1) for period in range(4)
+    ]
+    faculties = [Faculty(id=f, name=f) for f in faculty_ids]
+    lab_rooms = [LabRoom(id=f"LR{i}", name=f"Lab {i}") for i in range(2 if num_labs else 0)]
+    return ScheduleContext(subjects, faculties, sections, lab_rooms, master_schedule)
+
+
+def seeded(context, seed, backtracking=False):
+    """A CSP-seeded chromosome of context"""
+    chromosome = OptimizedTimetableChromosome.from_context(context)
+    chromosome.initialize_with_csp(backtracking, random.Random(seed))
+    return chromosome
+
+
+def master_bits(context, faculty_id):
+    return context.master_occupancy.checker.faculty_masks.get(faculty_id, 0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rebuilt_checker_keeps_master_schedule(seed):
+    context = make_context(seed)
+    parent = seeded(context, seed)
+    child = parent.clone(list(reversed(parent.genes)))
+    for faculty_id in context.faculties:
+        master = master_bits(context, faculty_id)
+        assert master
+        assert child.constraint_checker.faculty_masks[faculty_id] & master == master
+
+
+def on_master_slot(context, gene):
+    """True if the master schedule holds gene's faculty, section or room at its slot"""
+    busy = context.master_occupancy.checker.busy_mask(
+        gene.faculty_id, gene.section_id, gene.room_id, gene.is_theory
+    )
+    return bool(busy >> (gene.day * context.periods_per_day + gene.period) & 1)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_guided_mutation_never_lands_on_master_slots(seed):
+    context = make_context(seed)
+    parent = seeded(context, seed)
+    # A rebuilt checker (here a crossover child's) must still know the master slots
+    chromosome = parent.column_crossover(seeded(context, seed + 100),
+                                         {(section_id, 2) for section_id in context.gene_section_ids})
+    rng = np.random.default_rng(seed)
+    for _ in range(200):
+        before = list(chromosome.genes)
+        # A high temperature keeps almost every move, good or bad
+        chromosome.guided_mutation(rng, temperature=1e6)
+        for old, new in zip(before, chromosome.genes):
+            if new is not old:
+                assert not on_master_slot(context, new)
+
+
+def theory_hours(chromosome):
+    return Counter((gene.section_id, gene.subject_code)
+                   for gene in chromosome.genes if gene.is_theory)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_column_crossover_keeps_hours_without_section_conflicts(seed):
+    context = make_context(seed, num_sections=3)
+    parents = [seeded(context, seed + k, backtracking=k == 0) for k in range(4)]
+    columns = [(section_id, day) for section_id in context.gene_section_ids
+               for day in range(context.days_per_week)]
+    rng = np.random.default_rng(seed)
+    for _ in range(20):
+        a, b = rng.choice(len(parents), 2, replace=False)
+        p1, p2 = parents[a], parents[b]
+        swapped = {columns[i] for i in np.flatnonzero(rng.random(len(columns)) < 0.5)}
+        child = p1.column_crossover(p2, swapped)
+        assert theory_hours(child) == theory_hours(p1)
+        assert len(child.genes) == len(p1.genes)
+        assert (child._compute_all_metrics()['section_conflicts']
+                <= p1._compute_all_metrics()['section_conflicts'])
+        assert not any(on_master_slot(context, gene) for gene in child.genes)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("num_sections, num_faculties", [(2, NUM_FACULTIES), (3, 2)])
+def test_backtracking_seed_is_conflict_free(seed, num_sections, num_faculties):
+    # Two faculties over three sections force displacements (and drops)
+    context = make_context(seed, num_sections, num_faculties)
+    chromosome = seeded(context, seed, backtracking=True)
+    expected = Counter({(subject.section_id, subject.subject_code): subject.theory_hours
+                        for subject in context.subjects if subject.theory_hours})
+    if num_faculties == NUM_FACULTIES:
+        assert theory_hours(chromosome) == expected
+    else:
+        assert theory_hours(chromosome) <= expected
+    metrics = chromosome._compute_all_metrics()
+    assert metrics['faculty_conflicts'] == metrics['section_conflicts'] == 0
+    assert metrics['room_conflicts'] == 0
+    assert not any(on_master_slot(context, gene) for gene in chromosome.genes)
+    # The checker the search leaves behind matches a rebuild from the genes
+    checker = chromosome.constraint_checker
+    chromosome.rebuild_constraint_checker()
+    for masks in ('faculty_masks', 'section_masks', 'room_masks'):
+        assert ({k: v for k, v in getattr(checker, masks).items() if v}
+                == {k: v for k, v in getattr(chromosome.constraint_checker, masks).items() if v})
+
+
+def scrambled(chromosome, rng, num_moves):
+    """Copy of chromosome with num_moves random genes (labs and projects too) on random slots"""
+    genes = list(chromosome.genes)
+    for idx in rng.integers(len(genes), size=num_moves).tolist():
+        genes[idx] = genes[idx].moved(int(rng.integers(chromosome.days_per_week)),
+                                      int(rng.integers(chromosome.periods_per_day)))
+    return chromosome.clone(genes)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("num_moves", [0, 10, 40])
+def test_metrics_kernel_matches_numpy_metrics(seed, num_moves):
+    context = make_context(seed, num_sections=3, num_labs=2)
+    chromosome = scrambled(seeded(context, seed), np.random.default_rng(seed), num_moves)
+    columns = chromosome._build_arrays()
+    for early_exit in (False, True):
+        kernel = dict(zip(METRIC_KEYS, metrics_kernel(
+            *columns, context.afternoon_mask, context.days_per_week, context.periods_per_day,
+            WEIGHT_VECTOR, early_exit,
+        ).tolist()))
+        numpy = chromosome._vectorized_metrics(*columns, early_exit=early_exit)
+        if not early_exit:
+            assert kernel == numpy
+        # Early exits may stop at different points, but only once fitness is clamped to 0
+        assert (chromosome.set_fitness_from_metrics(kernel)
+                == chromosome.set_fitness_from_metrics(numpy))
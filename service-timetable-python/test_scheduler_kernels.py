@@ -0,0 +1,106 @@
+"""
+Invariants of the tabu search kernels on packed theory genes.
+Run with: python -m pytest test_scheduler_kernels.py
+"""
+
+import numpy as np
+import pytest
+
+from scheduler import WEIGHT_VECTOR
+from scheduler_kernels import (
+    COL_DAY, COL_FACULTY, COL_PERIOD, COL_ROOM, COL_SECTION, COL_SUBJECT,
+    build_bookings, master_busy, metrics_kernel, seed_kernel_rng, tabu_search,
+)
+
+NUM_DAYS, NUM_PERIODS = 6, 7
+AFTERNOON = np.array([False] * 4 + [True] * 3)
+
+
+def tight_pack(rng, num_sections=5, num_faculties=3, subjects_per_section=4):
+    """
+    Theory-only genes where a few faculties teach every section, placed
+    conflict-free on random slots (so with plenty of gaps to close)
+    """
+    faculty_free = np.ones((num_faculties, NUM_DAYS * NUM_PERIODS), dtype=bool)
+    rows = []
+    for section in range(num_sections):
+        section_free = np.ones(NUM_DAYS * NUM_PERIODS, dtype=bool)
+        for k in range(subjects_per_section):
+            subject = section * subjects_per_section + k
+            faculty = int(rng.integers(num_faculties))
+            for _ in range(int(rng.integers(3, 5))):
+                free = np.flatnonzero(section_free & faculty_free[faculty])
+                if not free.size:
+                    break
+                slot = int(rng.choice(free))
+                section_free[slot] = faculty_free[faculty, slot] = False
+                day, period = divmod(slot, NUM_PERIODS)
+                rows.append((subject, section, 0, day, period, faculty, section))
+    return np.array(rows, dtype=np.int32)
+
+
+def hard_conflicts(pack, theory):
+    """Faculty, section and room over-bookings of pack"""
+    faculty_busy, section_busy, room_busy, _ = build_bookings(pack, theory, NUM_DAYS, NUM_PERIODS)
+    return sum(int(np.maximum(busy - 1, 0).sum()) for busy in (faculty_busy, section_busy, room_busy))
+
+
+def raw_fitness(pack, theory):
+    """Exact raw fitness of pack (no clamping)"""
+    metrics = metrics_kernel(
+        pack[:, COL_DAY], pack[:, COL_PERIOD], pack[:, COL_FACULTY], pack[:, COL_SECTION],
+        pack[:, COL_ROOM], pack[:, COL_SUBJECT], np.zeros(len(pack), np.int32), theory,
+        np.zeros(len(pack), dtype=bool), AFTERNOON, NUM_DAYS, NUM_PERIODS, WEIGHT_VECTOR, False,
+    )
+    return int(1000 - metrics @ WEIGHT_VECTOR)
+
+
+def shuffled(rng, pack, num_moves):
+    """pack with num_moves genes dropped on random slots (may add conflicts)"""
+    pack = pack.copy()
+    for g in rng.integers(len(pack), size=num_moves):
+        pack[g, COL_DAY] = rng.integers(NUM_DAYS)
+        pack[g, COL_PERIOD] = rng.integers(NUM_PERIODS)
+    return pack
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("num_moves", [0, 5])
+def test_tabu_search_never_adds_hard_conflicts(seed, num_moves):
+    rng = np.random.default_rng(seed)
+    pack = shuffled(rng, tight_pack(rng), num_moves)
+    theory = np.ones(len(pack), dtype=bool)
+    movable = np.arange(len(pack))
+    before = hard_conflicts(pack, theory)
+
+    seed_kernel_rng(seed)
+    for _ in range(10):
+        tabu_search(pack, theory, movable, np.zeros(len(pack), np.int64),
+                    raw_fitness(pack, theory), AFTERNOON, WEIGHT_VECTOR,
+                    NUM_DAYS, NUM_PERIODS, 50, 20)
+        after = hard_conflicts(pack, theory)
+        assert after <= before
+        before = after
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_tabu_search_never_moves_onto_master_slots(seed):
+    rng = np.random.default_rng(seed)
+    pack = tight_pack(rng)
+    theory = np.ones(len(pack), dtype=bool)
+    movable = np.arange(len(pack))
+    # The master schedule holds every faculty on days 0-1, periods 0-3,
+    # and a few random slots of each section
+    morning = sum(1 << (day * NUM_PERIODS + period) for day in (0, 1) for period in range(4))
+    section_slots = rng.integers(0, 1 << (NUM_DAYS * NUM_PERIODS), pack[:, COL_SECTION].max() + 1)
+    blocked = (morning | section_slots[pack[:, COL_SECTION]]).astype(np.int64)
+    start = pack[:, [COL_DAY, COL_PERIOD]].copy()
+
+    seed_kernel_rng(seed)
+    for _ in range(10):
+        tabu_search(pack, theory, movable, blocked, raw_fitness(pack, theory), AFTERNOON,
+                    WEIGHT_VECTOR, NUM_DAYS, NUM_PERIODS, 50, 20)
+    for g in range(len(pack)):
+        day, period = pack[g, COL_DAY], pack[g, COL_PERIOD]
+        moved = day != start[g, 0] or period != start[g, 1]
+        assert not (moved and master_busy(blocked, g, day, period, NUM_PERIODS))